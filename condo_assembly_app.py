@@ -1,11 +1,18 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import sqlite3
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from collections import Counter, defaultdict
+import csv
+import concurrent.futures
+import contextlib
+from collections import defaultdict
 import os
+import pickle
+import pathlib
 import datetime
+import functools
+import itertools
+import traceback
+import json
 
 # --- Configuración ---
 HOST_DATA_DIR = "condominio_db_data"
@@ -23,11 +30,170 @@ TIPO_RESIDENTE_ASISTENTE = 'asistente'
 
 # Constante para límite de inasistencias
 LIMITE_INASISTENCIAS_VOTO = 3
+# Espera antes de recargar la asamblea elegida (agrupa selecciones rápidas en el combobox)
+RETARDO_CARGA_ASAMBLEA_MS = 150
+# Cada cuánto revisa Tk si el hilo lector ya entregó el resultado de una consulta
+INTERVALO_SONDEO_LECTOR_MS = 10
+LOTE_LECTURA_FILAS = 1000  # filas por fetchmany en el hilo lector
+# Búsqueda de votantes: espera tras la última tecla y máximo de coincidencias cargadas en el combobox
+RETARDO_BUSQUEDA_VOTANTE_MS = 200
+LIMITE_SUGERENCIAS_VOTANTES = 50
+LIMITE_PREGUNTAS_COMBOBOX = 200
+# Votos registrados en ráfaga: los resultados se redibujan como mucho una vez por intervalo
+RETARDO_REFRESCO_RESULTADOS_MS = 500
+LOTE_IMPORTACION_VOTOS = 10000  # filas por executemany al cargar votos en bloque
+
+# Títulos del gráfico de resultados según el estado de la pregunta
+TITULO_RESULTADOS_FINALES = "Resultados Finales: {}"
+TITULOS_RESULTADOS = {ESTADO_PREGUNTA_ACTIVA: "Resultados Parciales: {} (Votación Abierta)",
+                      ESTADO_PREGUNTA_CERRADA: "Resultados (Votación Cerrada): {}"}
+TITULO_RESULTADOS = "Resultados: {}"
+
+# --- Sentencias SQL ---
+# Cadenas fijas a nivel de módulo: sqlite3 reutiliza la sentencia ya preparada (cached_statements) en cada llamada.
+# Residentes
+# Etiqueta 'cedula: nombre (casa)' de los combobox, armada por SQLite junto con la fila
+SQL_ETIQUETA_RESIDENTE = "cedula || ': ' || nombre || ' (' || casa || ')'"
+# Las 7 primeras columnas ya vienen como las muestra el árbol de residentes (tipo capitalizado, estado en texto)
+SQL_RESIDENTES_TODOS = f"""SELECT cedula, nombre, upper(substr(tipo_residente, 1, 1)) || substr(tipo_residente, 2),
+CASE WHEN activo = 1 THEN 'Activo' ELSE 'Inactivo' END, preguntas_consecutivas_sin_votar, celular, casa,
+{SQL_ETIQUETA_RESIDENTE}, activo FROM residentes ORDER BY activo DESC, nombre"""
+SQL_RESIDENTES_ACTIVOS = f"SELECT cedula, nombre, casa, {SQL_ETIQUETA_RESIDENTE} FROM residentes WHERE activo = 1 ORDER BY nombre"
+SQL_REPRESENTANTE_ACTIVO_CASA = "SELECT cedula, nombre FROM residentes WHERE casa = ? AND tipo_residente = ? AND activo = 1"
+SQL_REPRESENTANTE_ACTIVO_CASA_OTRO = SQL_REPRESENTANTE_ACTIVO_CASA + " AND cedula != ?"
+SQL_CASAS_CON_REPRESENTANTE = "SELECT DISTINCT casa FROM residentes WHERE tipo_residente = ? AND activo = 1"
+SQL_TIPO_RESIDENTE_ACTIVO = "SELECT tipo_residente FROM residentes WHERE cedula = ? AND activo = 1"
+SQL_CEDULA_EXISTE = "SELECT 1 FROM residentes WHERE cedula = ?"
+SQL_CELULAR_EN_USO = "SELECT 1 FROM residentes WHERE celular = ? AND cedula != ?"
+SQL_NOMBRE_RESIDENTE = "SELECT nombre FROM residentes WHERE cedula = ?"
+SQL_INSERTAR_RESIDENTE = "INSERT INTO residentes (cedula, nombre, celular, casa, tipo_residente, activo) VALUES (?, ?, ?, ?, ?, 1)"
+SQL_ACTUALIZAR_RESIDENTE = "UPDATE residentes SET nombre=?, celular=?, casa=?, tipo_residente=? WHERE cedula=?"
+# Al reactivar se reinician también las ausencias; dos sentencias fijas para que cada una quede preparada en caché
+SQL_ACTIVAR_RESIDENTE = "UPDATE residentes SET activo = 1, preguntas_consecutivas_sin_votar = 0 WHERE cedula = ?"
+SQL_DESACTIVAR_RESIDENTE = "UPDATE residentes SET activo = 0 WHERE cedula = ?"
+SQL_REINICIAR_AUSENCIAS = "UPDATE residentes SET preguntas_consecutivas_sin_votar = 0 WHERE ultima_asamblea_actividad != ? OR ultima_asamblea_actividad IS NULL"
+# Cédulas recibidas como un único parámetro JSON: el texto SQL no cambia con la cantidad y se reutiliza preparado
+SQL_INASISTENCIA_RESIDENTES = """SELECT cedula, preguntas_consecutivas_sin_votar, ultima_asamblea_actividad FROM residentes
+WHERE cedula IN (SELECT value FROM json_each(?))"""
+SQL_ACTUALIZAR_INASISTENCIA = "UPDATE residentes SET preguntas_consecutivas_sin_votar = ?, ultima_asamblea_actividad = ?, activo = ? WHERE cedula = ?"
+SQL_MARCAR_RESIDENTE_VOTO = "UPDATE residentes SET preguntas_consecutivas_sin_votar = 0, ultima_asamblea_actividad = ? WHERE cedula = ?"
+# Asambleas y poderes
+SQL_ASAMBLEAS = "SELECT id, fecha, descripcion FROM asambleas ORDER BY fecha DESC, id DESC"
+# RETURNING (SQLite >= 3.35) devuelve la fila creada en la misma ida a la base
+SQL_INSERTAR_ASAMBLEA = "INSERT INTO asambleas (fecha, descripcion) VALUES (?, ?) RETURNING id, fecha, descripcion"
+SQL_PODERES_ASAMBLEA = "SELECT id, cedula_da_poder, cedula_recibe_poder FROM poderes WHERE asamblea_id = ?"
+SQL_PODER_EXISTENTE = "SELECT 1 FROM poderes WHERE asamblea_id = ? AND cedula_da_poder = ?"
+SQL_INSERTAR_PODER = "INSERT INTO poderes (asamblea_id, cedula_da_poder, cedula_recibe_poder) VALUES (?, ?, ?)"
+SQL_ELIMINAR_PODER = "DELETE FROM poderes WHERE id=? AND asamblea_id=?"
+# Preguntas
+# Una sola lectura alimenta el árbol de preguntas y el combobox de votación (etiqueta 'id: texto')
+SQL_PREGUNTAS_ASAMBLEA = "SELECT id, texto_pregunta, opciones_configuradas, estado, id || ': ' || texto_pregunta FROM preguntas WHERE asamblea_id = ? ORDER BY id"
+SQL_TEXTO_PREGUNTA = "SELECT texto_pregunta FROM preguntas WHERE id = ?"
+SQL_ESTADO_PREGUNTA = "SELECT estado FROM preguntas WHERE id = ?"
+SQL_PREGUNTAS_ASAMBLEA_ESTADO = "SELECT id, opciones_configuradas FROM preguntas WHERE asamblea_id = ? AND estado = ?"
+SQL_OPCIONES_PREGUNTA = "SELECT opciones_configuradas FROM preguntas WHERE id = ?"
+SQL_INSERTAR_PREGUNTA = "INSERT INTO preguntas (asamblea_id, texto_pregunta, opciones_configuradas, estado) VALUES (?, ?, ?, ?)"
+# Solo se editan preguntas inactivas; RETURNING indica si se actualizó sin una consulta previa del estado
+SQL_ACTUALIZAR_PREGUNTA = "UPDATE preguntas SET texto_pregunta = ?, opciones_configuradas = ? WHERE id = ? AND estado = ? RETURNING id"
+SQL_CAMBIAR_ESTADO_PREGUNTA = "UPDATE preguntas SET estado = ? WHERE id = ?"
+# Activa una pregunta y cierra la anterior (si la hay) en una sola sentencia
+SQL_ACTIVAR_PREGUNTA = f"""UPDATE preguntas
+SET estado = CASE WHEN id = ? THEN '{ESTADO_PREGUNTA_ACTIVA}' ELSE '{ESTADO_PREGUNTA_CERRADA}' END
+WHERE id IN (?, ?) AND asamblea_id = ?"""
+# Votos
+SQL_VOTANTES_PREGUNTA = "SELECT cedula_votante FROM votos WHERE pregunta_id = ?"
+SQL_VOTO_EXISTENTE = "SELECT id FROM votos WHERE pregunta_id = ? AND cedula_votante = ?"
+# Alta o cambio de voto en una sola sentencia (UNIQUE (pregunta_id, cedula_votante) de la tabla)
+SQL_GUARDAR_VOTO = """INSERT INTO votos (pregunta_id, cedula_votante, opcion_elegida) VALUES (?, ?, ?)
+ON CONFLICT (pregunta_id, cedula_votante) DO UPDATE SET opcion_elegida = excluded.opcion_elegida"""
+# Pesos de voto de la asamblea (:asamblea): 1 al primer representante activo por casa, 0 a asistentes,
+# excluyendo a quien dio poder; los poderes recibidos se suman solo a quien ya tiene peso.
+# 'activos' descarta a quien dio poder con un anti-join (LEFT JOIN ... IS NULL) sobre el UNIQUE de poderes.
+SQL_PESOS_VOTO_CTE = f"""WITH activos AS (
+    SELECT r.rowid AS rid, r.cedula, r.tipo_residente, r.casa FROM residentes r
+    LEFT JOIN poderes dp ON dp.asamblea_id = :asamblea AND dp.cedula_da_poder = r.cedula
+    WHERE r.activo = 1 AND dp.id IS NULL),
+representantes AS (
+    SELECT cedula, casa, ROW_NUMBER() OVER (PARTITION BY casa ORDER BY rid) AS orden FROM activos
+    WHERE tipo_residente = '{TIPO_RESIDENTE_REPRESENTANTE}'),
+base AS (
+    SELECT cedula, 1 AS peso FROM representantes WHERE orden = 1
+    UNION ALL SELECT cedula, 0 FROM activos WHERE tipo_residente = '{TIPO_RESIDENTE_ASISTENTE}'),
+pesos AS (
+    SELECT b.cedula, b.peso + COALESCE(p.recibidos, 0) AS peso FROM base b LEFT JOIN (
+        SELECT cedula_recibe_poder, COUNT(*) AS recibidos FROM poderes WHERE asamblea_id = :asamblea
+        GROUP BY cedula_recibe_poder) p ON p.cedula_recibe_poder = b.cedula)
+"""
+# Datos de la pregunta :pregunta (texto, estado, opciones) junto a su conteo por opción (votantes y peso),
+# agregado en SQLite: una fila por opción votada, o una sola con opción NULL si aún no hay votos.
+SQL_CONTEO_VOTOS = SQL_PESOS_VOTO_CTE + """, conteo AS (
+    SELECT v.opcion_elegida, COUNT(*) AS votos, COALESCE(SUM(p.peso), 0) AS peso
+    FROM votos v LEFT JOIN pesos p ON p.cedula = v.cedula_votante WHERE v.pregunta_id = :pregunta
+    GROUP BY v.opcion_elegida)
+SELECT q.texto_pregunta, q.estado, q.opciones_configuradas, c.opcion_elegida, c.votos, c.peso
+FROM preguntas q LEFT JOIN conteo c WHERE q.id = :pregunta"""
+SQL_PESOS_VOTO = SQL_PESOS_VOTO_CTE + "SELECT cedula, peso FROM pesos"
+# Votantes elegibles: el representante de cada unidad y los asistentes con poder de una unidad sin representante
+SQL_VOTANTES_ELEGIBLES = SQL_PESOS_VOTO_CTE + f"""SELECT cedula FROM representantes WHERE orden = 1
+UNION
+SELECT a.cedula FROM activos a
+JOIN poderes rp ON rp.asamblea_id = :asamblea AND rp.cedula_recibe_poder = a.cedula
+LEFT JOIN representantes rep ON rep.casa = a.casa AND rep.orden = 1
+WHERE a.tipo_residente = '{TIPO_RESIDENTE_ASISTENTE}' AND rep.cedula IS NULL"""
+
+
+# --- Opciones de pregunta ---
+OPCIONES_PREDETERMINADAS = ("Acepta", "No Acepta", "En Blanco")
+
+
+@functools.lru_cache(maxsize=256)
+def parse_question_options(raw):
+    # opciones_configuradas se guarda como arreglo JSON; las preguntas antiguas tienen texto separado por comas.
+    # Memorizado por el texto crudo: cada pregunta se interpreta una sola vez aunque se redibuje muchas veces.
+    # Un texto antiguo que empieza con '[' (p. ej. '[A], B') no es JSON válido y se interpreta por comas.
+    if not raw: return OPCIONES_PREDETERMINADAS
+    try:
+        options = json.loads(raw)
+    except json.JSONDecodeError:
+        options = None
+    if isinstance(options, list): return tuple(str(opt) for opt in options)
+    return tuple(opt.strip() for opt in raw.split(','))
+
+
+def serialize_question_options(text):
+    # Texto del formulario ('A, B, C') -> arreglo JSON para opciones_configuradas. El formulario separa las
+    # opciones por comas, así que una opción no puede contener comas (el árbol y la edición las unen con ',').
+    options = [opt.strip() for opt in text.split(',') if opt.strip()] or list(OPCIONES_PREDETERMINADAS)
+    return json.dumps(options, ensure_ascii=False)
+
+
+def save_figure_snapshot(snapshot, filepath):
+    # Corre en el hilo de guardado: la figura se reconstruye desde su copia (pickle), independiente de la que
+    # muestra Tk, y se renderiza a PNG con Agg sin bloquear la interfaz.
+    pickle.loads(snapshot).savefig(filepath, bbox_inches='tight')
+    return filepath
 
 
 # --- Funciones de Base de Datos e Inicialización ---
+def apply_connection_pragmas(conn):
+    # Ajustes por conexión: fsync solo en checkpoints (seguro con WAL), caché de páginas de ~20 MB,
+    # lectura vía mmap y temporales en memoria.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+def open_readonly_connection():
+    # Conexión de solo lectura (URI mode=ro) para las consultas; con WAL no compite con la de escritura.
+    uri = pathlib.Path(DB_NAME).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+    apply_connection_pragmas(conn)
+    return conn
+
+
 def init_app_dirs_and_db():
-    # (Sin cambios)
+    # Crea/migra el esquema y devuelve la conexión abierta para que la App la reutilice.
     if not os.path.exists(HOST_DATA_DIR):
         try:
             os.makedirs(HOST_DATA_DIR)
@@ -39,50 +205,66 @@ def init_app_dirs_and_db():
         except OSError as e:
             print(f"Error creando {GRAFICOS_DIR}: {e}")
 
-    conn = sqlite3.connect(DB_NAME);
+    conn = sqlite3.connect(DB_NAME, cached_statements=256);
+    # WAL queda guardado en el archivo: los lectores no bloquean al escritor ni al revés.
+    conn.execute("PRAGMA journal_mode=WAL")
+    apply_connection_pragmas(conn)
     cursor = conn.cursor()
+    # Todo el DDL y las migraciones van en una sola transacción: un único commit (y fsync) al final.
+    cursor.execute("BEGIN")
     cursor.execute(
         '''CREATE TABLE IF NOT EXISTS residentes (cedula TEXT PRIMARY KEY, nombre TEXT NOT NULL, celular TEXT UNIQUE NOT NULL, casa TEXT NOT NULL, activo INTEGER DEFAULT 1, telegram_user_id INTEGER UNIQUE, tipo_residente TEXT DEFAULT 'representante', preguntas_consecutivas_sin_votar INTEGER DEFAULT 0, ultima_asamblea_actividad INTEGER)''')
     cols_to_add = {'tipo_residente': f"TEXT DEFAULT '{TIPO_RESIDENTE_REPRESENTANTE}'",
                    'preguntas_consecutivas_sin_votar': "INTEGER DEFAULT 0", 'ultima_asamblea_actividad': "INTEGER"}
-    existing_cols = [col[1] for col in cursor.execute("PRAGMA table_info(residentes)").fetchall()]
+    existing_cols = {col[1] for col in cursor.execute("PRAGMA table_info(residentes)")}
     for col, col_type in cols_to_add.items():
-        if col not in existing_cols:
-            try:
-                print(f"Añadiendo columna '{col}' a 'residentes'."); cursor.execute(
-                    f"ALTER TABLE residentes ADD COLUMN {col} {col_type}"); conn.commit()
-            except sqlite3.Error as e:
-                print(f"Error añadiendo {col}: {e}")
+        if col in existing_cols: continue
+        try:
+            print(f"Añadiendo columna '{col}' a 'residentes'."); cursor.execute(
+                f"ALTER TABLE residentes ADD COLUMN {col} {col_type}")
+        except sqlite3.Error as e:
+            print(f"Error añadiendo {col}: {e}")
     cursor.execute(
         '''CREATE TABLE IF NOT EXISTS asambleas (id INTEGER PRIMARY KEY AUTOINCREMENT, fecha TEXT NOT NULL, descripcion TEXT)''')
     cursor.execute(
         '''CREATE TABLE IF NOT EXISTS poderes (id INTEGER PRIMARY KEY AUTOINCREMENT, asamblea_id INTEGER NOT NULL, cedula_da_poder TEXT NOT NULL, cedula_recibe_poder TEXT NOT NULL, FOREIGN KEY (asamblea_id) REFERENCES asambleas(id), FOREIGN KEY (cedula_da_poder) REFERENCES residentes(cedula), FOREIGN KEY (cedula_recibe_poder) REFERENCES residentes(cedula), UNIQUE (asamblea_id, cedula_da_poder))''')
     cursor.execute(
         '''CREATE TABLE IF NOT EXISTS preguntas (id INTEGER PRIMARY KEY AUTOINCREMENT, asamblea_id INTEGER NOT NULL, texto_pregunta TEXT NOT NULL, opciones_configuradas TEXT, estado TEXT DEFAULT 'inactiva', FOREIGN KEY (asamblea_id) REFERENCES asambleas(id))''')
-    try:
-        cursor.execute("SELECT activa FROM preguntas LIMIT 1"); print(
-            "Migrando 'activa' a 'estado' en 'preguntas'."); cursor.execute(
-            "ALTER TABLE preguntas RENAME COLUMN activa TO estado_old_int"); cursor.execute(
-            f"ALTER TABLE preguntas ADD COLUMN estado TEXT DEFAULT '{ESTADO_PREGUNTA_INACTIVA}'"); cursor.execute(
-            f"UPDATE preguntas SET estado = '{ESTADO_PREGUNTA_ACTIVA}' WHERE estado_old_int = 1"); cursor.execute(
-            f"UPDATE preguntas SET estado = '{ESTADO_PREGUNTA_CERRADA}' WHERE estado_old_int = 0"); cursor.execute(
-            "ALTER TABLE preguntas DROP COLUMN estado_old_int"); conn.commit(); print("Migración completada.")
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cursor.execute("SELECT estado FROM preguntas LIMIT 1")
-    except sqlite3.OperationalError:
+    preguntas_cols = {col[1] for col in cursor.execute("PRAGMA table_info(preguntas)")}
+    if 'activa' in preguntas_cols and 'estado' not in preguntas_cols:
+        # Savepoint: si algún paso falla se deshace solo esta migración, no el resto de la transacción.
+        print("Migrando 'activa' a 'estado' en 'preguntas'."); cursor.execute("SAVEPOINT migrar_estado")
+        try:
+            cursor.execute("ALTER TABLE preguntas RENAME COLUMN activa TO estado_old_int"); cursor.execute(
+                f"ALTER TABLE preguntas ADD COLUMN estado TEXT DEFAULT '{ESTADO_PREGUNTA_INACTIVA}'"); cursor.execute(
+                f"UPDATE preguntas SET estado = '{ESTADO_PREGUNTA_ACTIVA}' WHERE estado_old_int = 1"); cursor.execute(
+                f"UPDATE preguntas SET estado = '{ESTADO_PREGUNTA_CERRADA}' WHERE estado_old_int = 0"); cursor.execute(
+                "ALTER TABLE preguntas DROP COLUMN estado_old_int"); cursor.execute("RELEASE migrar_estado")
+            preguntas_cols.add('estado'); print("Migración completada.")
+        except sqlite3.OperationalError as e:
+            cursor.execute("ROLLBACK TO migrar_estado"); cursor.execute("RELEASE migrar_estado")
+            print(f"Error migrando 'activa': {e}")
+    if 'estado' not in preguntas_cols:
         print("Añadiendo 'estado' a 'preguntas'."); cursor.execute(
-            f"ALTER TABLE preguntas ADD COLUMN estado TEXT DEFAULT '{ESTADO_PREGUNTA_INACTIVA}'"); conn.commit()
+            f"ALTER TABLE preguntas ADD COLUMN estado TEXT DEFAULT '{ESTADO_PREGUNTA_INACTIVA}'")
     cursor.execute(
         '''CREATE TABLE IF NOT EXISTS votos (id INTEGER PRIMARY KEY AUTOINCREMENT, pregunta_id INTEGER NOT NULL, cedula_votante TEXT NOT NULL, opcion_elegida TEXT NOT NULL, FOREIGN KEY (pregunta_id) REFERENCES preguntas(id), FOREIGN KEY (cedula_votante) REFERENCES residentes(cedula), UNIQUE (pregunta_id, cedula_votante))''')
-    conn.commit();
-    conn.close()
+    # Índices para los filtros más usados (poderes.asamblea_id y votos.pregunta_id ya los cubren sus UNIQUE).
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_preguntas_asamblea ON preguntas(asamblea_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_residentes_activo_nombre ON residentes(activo, nombre)")
+    # Búsqueda del representante activo de una casa (SQL_REPRESENTANTE_ACTIVO_CASA) al guardar residentes
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_residentes_casa_tipo_activo ON residentes(casa, tipo_residente, activo)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_poderes_asamblea_recibe ON poderes(asamblea_id, cedula_recibe_poder)")
+    # Cubre SQL_CONTEO_VOTOS: lee los votos de la pregunta ya agrupados por opción, sin B-tree temporal para el GROUP BY
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_votos_pregunta_opcion ON votos(pregunta_id, opcion_elegida, cedula_votante)")
+    conn.commit()
+    return conn
 
 
 # --- Clases de la Aplicación ---
 class App:
-    # ... ( __init__ y execute_query sin cambios) ...
     def __init__(self, root):
         self.root = root;
         self.root.title("Gestión de Asambleas");
@@ -93,6 +275,36 @@ class App:
         self.current_question_id = None
         self.current_question_options = [];
         self.editing_question_id = None
+        # Listas memorizadas; se invalidan (None) cuando se escribe en la tabla correspondiente.
+        self._residents_cache = None
+        self._residents_generation = 0  # sube en cada escritura de residentes; descarta lecturas en curso ya viejas
+        self._assemblies_cache = None
+        self._weights_cache = {}  # asamblea_id -> {cedula: peso}; cambia con poderes o altas/bajas de residentes
+        self._eligible_voters_cache = {}  # asamblea_id -> (cedulas, textos) de votantes elegibles; mismas invalidaciones
+        # Textos "cedula: nombre (casa)" e ids paralelos, precalculados junto con la lista de residentes.
+        self._residents_display = []
+        self._residents_ids = []
+        self._residents_by_id = {}  # cedula -> (nombre, casa) de los residentes activos
+        self._tree_rows = {}  # árbol -> {iid: valores mostrados}, para actualizarlo por diferencias (_sync_tree)
+        # Ids mostrados en cada combobox, en el mismo orden que sus 'values' (se indexan con current()).
+        self._proxy_combo_ids = []
+        self._assembly_combo_ids = []
+        self._voting_question_ids = []
+        self._voting_question_texts = []
+        self._voting_question_options = {}  # id de pregunta -> opciones ya interpretadas, de la última carga de preguntas
+        self._voting_questions = []  # filas completas de SQL_PREGUNTAS_ASAMBLEA; el combobox muestra un subconjunto
+        self._pending_question_search = None  # id de root.after del filtro de preguntas pendiente
+        self._voting_resident_ids = []
+        self._eligible_voters = ([], [])  # (cedulas, textos) elegibles completos; el combobox muestra un subconjunto
+        self._pending_voter_search = None  # id de root.after del filtro de votantes pendiente
+        self._pending_results_refresh = None  # id de root.after del redibujo de resultados pendiente
+        self._question_tree_iids = {}  # id de pregunta -> iid de su fila en questions_tree
+        self._last_results_state = None  # datos del último gráfico de resultados dibujado
+        # Última lista asignada a cada combobox, para no reenviar a Tk una lista idéntica.
+        self._combobox_values = {}
+        self._pending_assembly_load = None  # id de root.after de la recarga de asamblea pendiente
+        self._pending_residents_load = None  # id de root.after_idle de la recarga de residentes pendiente
+        self._assembly_view_dirty = False  # True si los paneles de la asamblea tienen datos cargados que limpiar
         self.notebook = ttk.Notebook(root)
         self.resident_tab = ttk.Frame(self.notebook);
         self.notebook.add(self.resident_tab, text='Residentes');
@@ -104,23 +316,112 @@ class App:
         self.notebook.add(self.voting_tab, text='Votación');
         self.setup_voting_tab()
         self.notebook.pack(expand=True, fill='both', padx=10, pady=10)
-        init_app_dirs_and_db();
+        # Conexión única para toda la sesión: evita abrir/cerrar el archivo en cada consulta.
+        # Se abre (junto con la migración y las cargas iniciales) cuando Tk queda ocioso, así la ventana se pinta antes.
+        self.conn = None
+        self.ro_conn = None
+        # Hilo lector con su propia conexión de solo lectura (WAL): los SELECT pesados no bloquean el bucle de Tk.
+        self.reader_conn = None
+        self._reader = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="lector-db")
+        # Hilo aparte para renderizar y escribir los PNG de resultados
+        self._chart_saver = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="graficos")
+        self._transaction_depth = 0
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.report_callback_exception = self.report_callback_exception
+        self.root.after_idle(self._bootstrap_db)
+
+    def _bootstrap_db(self):
+        self.conn = init_app_dirs_and_db()
+        self.ro_conn = open_readonly_connection()
+        self.reader_conn = open_readonly_connection()
         self.load_residents();
         self.load_assemblies()
 
+    def on_close(self):
+        self._reader.shutdown(wait=True)
+        self._chart_saver.shutdown(wait=True)
+        if self.reader_conn is not None:
+            self.reader_conn.close(); self.reader_conn = None
+        if self.ro_conn is not None:
+            self.ro_conn.close(); self.ro_conn = None
+        if self.conn is not None:
+            # Actualiza las estadísticas del planificador solo donde hace falta (mucho más barato que ANALYZE)
+            self.conn.execute("PRAGMA optimize")
+            self.conn.close(); self.conn = None
+        self.root.destroy()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        # Agrupa varias escrituras en una transacción; anidable: solo la más externa hace COMMIT/ROLLBACK.
+        outermost = self._transaction_depth == 0
+        self._transaction_depth += 1
+        try:
+            if outermost:
+                with self.conn: yield self.conn
+            else:
+                yield self.conn
+        finally:
+            self._transaction_depth -= 1
+
     def execute_query(self, query, params=(), fetchone=False, fetchall=False, commit=False):
-        conn = sqlite3.connect(DB_NAME);
-        cursor = conn.cursor()
+        # Lecturas por la conexión de solo lectura, salvo dentro de una transacción abierta (debe ver sus cambios).
+        use_writer = commit or self.conn.in_transaction
+        cursor = (self.conn if use_writer else self.ro_conn).cursor()
+        # sqlite3.Error se propaga (transaction() ya deshizo la escritura): la atiende el manejador de la acción
+        # o, si nadie la atrapa, report_callback_exception con un único diálogo.
+        try:
+            with self.transaction() if commit else contextlib.nullcontext():
+                cursor.execute(query, params)
+                return cursor.fetchone() if fetchone else cursor.fetchall() if fetchall else None
+        except sqlite3.Error as e:
+            print(f"Error DB: {e}\nQ: {query}\nP: {params}"); raise
+        finally:
+            cursor.close()
+
+    def report_callback_exception(self, exc_type, exc_value, exc_tb):
+        # Excepciones no atrapadas en callbacks de Tk: las de BD se informan al usuario, el resto va a consola.
+        if issubclass(exc_type, sqlite3.Error):
+            messagebox.showerror("Error DB", f"Detalle: {exc_value}"); return
+        traceback.print_exception(exc_type, exc_value, exc_tb)
+
+    def execute_batch(self, ops):
+        # Varias escrituras [(query, params), ...] en una sola transacción: un commit por acción del usuario.
+        # Como en execute_query, sqlite3.Error se propaga (ya deshecha) y el diálogo lo muestra quien la atiende.
+        try:
+            with self.transaction():
+                for query, params in ops: self.conn.execute(query, params)
+        except sqlite3.Error as e:
+            print(f"Error DB: {e}\nOps: {ops}"); raise
+
+    def execute_many(self, query, seq_of_params):
+        # Misma sentencia para muchas filas en una sola transacción (un solo commit); sqlite3.Error se propaga.
+        with self.transaction():
+            return self.conn.executemany(query, seq_of_params).rowcount
+
+    def query_in_background(self, query, params, callback, process_rows=list):
+        # Ejecuta el SELECT en el hilo lector, donde process_rows consume las filas por lotes (fetchmany) sin
+        # materializar el resultado crudo; callback recibe lo que devuelva, ya en el hilo de Tk.
+        future = self._reader.submit(self._read_in_batches, query, params, process_rows)
+        self._deliver_background_result(future, query, params, callback)
+
+    def _read_in_batches(self, query, params, process_rows):
+        cursor = self.reader_conn.cursor()
         try:
             cursor.execute(query, params)
-            if commit: conn.commit()
-            result = cursor.fetchone() if fetchone else cursor.fetchall() if fetchall else None
+            return process_rows(row for rows in iter(lambda: cursor.fetchmany(LOTE_LECTURA_FILAS), []) for row in rows)
+        finally:
+            cursor.close()
+
+    def _deliver_background_result(self, future, query, params, callback):
+        if not future.done():
+            self.root.after(INTERVALO_SONDEO_LECTOR_MS, self._deliver_background_result, future, query, params, callback)
+            return
+        try:
+            rows = future.result()
         except sqlite3.Error as e:
             messagebox.showerror("Error DB", f"Detalle: {e}\nQ: {query}\nP: {params}"); print(
-                f"Error DB: {e}\nQ: {query}\nP: {params}");
-        finally:
-            if conn: conn.close()
-        return result
+                f"Error DB: {e}\nQ: {query}\nP: {params}"); return
+        callback(rows)
 
     # --- Pestaña de Residentes (sin cambios) ---
     def setup_resident_tab(self):
@@ -180,6 +481,8 @@ class App:
         ttk.Button(resident_actions_frame, text="Activar/Desactivar", command=self.toggle_resident_activation).pack(
             side=tk.LEFT, padx=5)
         ttk.Button(resident_actions_frame, text="Refrescar", command=self.load_residents).pack(side=tk.LEFT, padx=5)
+        ttk.Button(resident_actions_frame, text="Importar CSV", command=self.import_residents_dialog).pack(side=tk.LEFT,
+                                                                                                           padx=5)
 
     def clear_resident_fields(self):
         self.resident_cedula_entry.config(state='normal');
@@ -202,26 +505,32 @@ class App:
         if tipo_residente_ui not in [TIPO_RESIDENTE_REPRESENTANTE, TIPO_RESIDENTE_ASISTENTE]: messagebox.showerror(
             "Error", f"Tipo inválido: {tipo_residente_ui}"); return
         if tipo_residente_ui == TIPO_RESIDENTE_REPRESENTANTE:
-            query = "SELECT cedula, nombre FROM residentes WHERE casa = ? AND tipo_residente = ? AND activo = 1"
-            params = [casa, TIPO_RESIDENTE_REPRESENTANTE]
-            if self.resident_cedula_to_update: query += " AND cedula != ?"; params.append(
-                self.resident_cedula_to_update)
-            existing_rep = self.execute_query(query, tuple(params), fetchone=True)
+            if self.resident_cedula_to_update:
+                existing_rep = self.execute_query(SQL_REPRESENTANTE_ACTIVO_CASA_OTRO, (
+                    casa, TIPO_RESIDENTE_REPRESENTANTE, self.resident_cedula_to_update), fetchone=True)
+            else:
+                existing_rep = self.execute_query(SQL_REPRESENTANTE_ACTIVO_CASA, (casa, TIPO_RESIDENTE_REPRESENTANTE),
+                                                  fetchone=True)
             if existing_rep: messagebox.showerror("Error Representante",
                                                   f"Ya existe rep. activo ('{existing_rep[1]}', Céd: {existing_rep[0]}) para unidad '{casa}'.\nSolo 1 rep. por unidad."); return
+        # Duplicados detectados con una lectura indexada; la IntegrityError queda solo como respaldo.
+        if not self.resident_cedula_to_update and self.execute_query(SQL_CEDULA_EXISTE, (cedula,), fetchone=True):
+            messagebox.showerror("Duplicado", f"Cédula '{cedula}' ya existe."); return
+        if self.execute_query(SQL_CELULAR_EN_USO, (celular, self.resident_cedula_to_update or cedula), fetchone=True):
+            messagebox.showerror("Duplicado", f"Celular '{celular}' ya existe."); return
         try:
-            if self.resident_cedula_to_update:
-                self.execute_query("UPDATE residentes SET nombre=?, celular=?, casa=?, tipo_residente=? WHERE cedula=?",
-                                   (nombre, celular, casa, tipo_residente_ui, self.resident_cedula_to_update),
-                                   commit=True)
-                messagebox.showinfo("Éxito", "Residente actualizado.");
-            else:
-                self.execute_query(
-                    "INSERT INTO residentes (cedula, nombre, celular, casa, tipo_residente, activo) VALUES (?, ?, ?, ?, ?, 1)",
-                    (cedula, nombre, celular, casa, tipo_residente_ui), commit=True)
-                messagebox.showinfo("Éxito", "Residente registrado.");
-            self.clear_resident_fields();
-            self.load_residents()
+            # La IntegrityError (respaldo de las verificaciones previas) llega a este except.
+            with self.transaction():
+                if self.resident_cedula_to_update:
+                    self.conn.execute(SQL_ACTUALIZAR_RESIDENTE,
+                                      (nombre, celular, casa, tipo_residente_ui, self.resident_cedula_to_update))
+                else:
+                    self.conn.execute(SQL_INSERTAR_RESIDENTE, (cedula, nombre, celular, casa, tipo_residente_ui))
+            self._invalidate_residents()
+            self._invalidate_weights()
+            messagebox.showinfo("Éxito", "Residente actualizado." if self.resident_cedula_to_update else
+                                "Residente registrado.");
+            self.clear_resident_fields()
         except sqlite3.IntegrityError as e:
             if "UNIQUE constraint failed: residentes.cedula" in str(e):
                 messagebox.showerror("Duplicado", f"Cédula '{cedula}' ya existe.")
@@ -232,6 +541,60 @@ class App:
         except Exception as e:
             messagebox.showerror("Error", f"Error inesperado: {e}")
 
+    def bulk_insert_residents(self, rows):
+        # Inserta muchos residentes (cedula, nombre, celular, casa, tipo_residente) en una sola transacción:
+        # o entran todos o ninguno (IntegrityError se propaga al llamador). Igual que save_resident, solo admite
+        # un representante activo por casa: si se repite, ValueError y no entra ninguno.
+        with self.transaction():
+            taken = {row[0] for row in self.execute_query(SQL_CASAS_CON_REPRESENTANTE,
+                                                          (TIPO_RESIDENTE_REPRESENTANTE,), fetchall=True)}
+
+            def checked(rows):
+                for row in rows:
+                    if row[4] == TIPO_RESIDENTE_REPRESENTANTE:
+                        if row[3] in taken: raise ValueError(
+                            f"Cédula {row[0]}: la casa '{row[3]}' ya tiene un representante activo.")
+                        taken.add(row[3])
+                    yield row
+
+            inserted = self.execute_many(SQL_INSERTAR_RESIDENTE, checked(rows))
+        self._invalidate_residents()
+        self._invalidate_weights()
+        return inserted
+
+    @staticmethod
+    def _csv_row_to_resident(row):
+        cedula, nombre, celular, casa = (value.strip() for value in row[:4])
+        tipo = row[4].strip().lower() if len(row) > 4 and row[4].strip() else TIPO_RESIDENTE_REPRESENTANTE
+        if not cedula or not nombre or not celular or not casa: raise ValueError(f"Fila incompleta: {row}")
+        if tipo not in (TIPO_RESIDENTE_REPRESENTANTE, TIPO_RESIDENTE_ASISTENTE): raise ValueError(
+            f"Tipo inválido en fila: {row}")
+        return cedula, nombre, celular, casa, tipo
+
+    def import_residents_csv(self, path):
+        # CSV con columnas cedula, nombre, celular, casa[, tipo_residente]; tipo vacío = representante.
+        # La primera fila se toma como cabecera (y se omite) si su primera columna dice 'cedula'/'cédula'.
+        # Las filas se generan mientras executemany las consume (no se arma la lista completa).
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first and first[0].strip().lower() not in ('cedula', 'cédula'): reader = itertools.chain([first], reader)
+            rows = (self._csv_row_to_resident(row) for row in reader if row)
+            return self.bulk_insert_residents(rows)
+
+    def import_residents_dialog(self):
+        path = filedialog.askopenfilename(title="Importar residentes",
+                                          filetypes=[("CSV", "*.csv"), ("Todos", "*.*")])
+        if not path: return
+        try:
+            inserted = self.import_residents_csv(path)
+        except sqlite3.IntegrityError as e:
+            messagebox.showerror("Duplicado", f"Importación cancelada (cédula o celular repetido):\n{e}"); return
+        except (ValueError, OSError, csv.Error, sqlite3.Error) as e:
+            messagebox.showerror("Error", f"Importación cancelada:\n{e}"); return
+        messagebox.showinfo("Éxito", f"{inserted} residentes importados.");
+        self.load_residents()
+
     def on_resident_select(self, event=None):
         selected_item = self.resident_tree.focus();
         if not selected_item: return
@@ -250,27 +613,102 @@ class App:
             self.resident_house_entry.delete(0, tk.END);
             self.resident_house_entry.insert(0, values[6])
 
+    @staticmethod
+    def _clear_tree(tree):
+        # Un único 'delete' con todos los ítems en vez de una llamada a Tcl por fila.
+        children = tree.get_children()
+        if children: tree.delete(*children)
+
+    def _fill_tree(self, tree, rows):
+        # Vacía el árbol y carga las filas ya formateadas en un solo recorrido.
+        self._clear_tree(tree)
+        # Llamada directa a Tcl: la tupla pasa como lista Tcl sin el formateo de opciones de ttk.Treeview.insert
+        call, path = tree.tk.call, tree._w
+        for values in rows: call(path, "insert", "", "end", "-values", values)
+
+    def _sync_tree(self, tree, rows):
+        # rows: pares (iid, valores) en el orden deseado. Solo se insertan, actualizan o borran las filas que
+        # cambiaron respecto a lo ya mostrado, y se reordena únicamente si el orden es distinto.
+        shown = self._tree_rows.get(tree, {})
+        new_rows = {}
+        call, path = tree.tk.call, tree._w  # inserción directa en Tcl, como en _fill_tree
+        for iid, values in rows:
+            if iid not in shown:
+                call(path, "insert", "", "end", "-id", iid, "-values", values)
+            elif shown[iid] != values:
+                tree.item(iid, values=values)
+            new_rows[iid] = values
+        removed = [iid for iid in shown if iid not in new_rows]
+        if removed: tree.delete(*removed)
+        order = tuple(new_rows)
+        if tree.get_children() != order:
+            for index, iid in enumerate(order): tree.move(iid, "", index)
+        self._tree_rows[tree] = new_rows
+
     def load_residents(self):
-        for i in self.resident_tree.get_children(): self.resident_tree.delete(i)
-        rows = self.execute_query(
-            "SELECT cedula, nombre, tipo_residente, activo, preguntas_consecutivas_sin_votar, celular, casa FROM residentes ORDER BY activo DESC, nombre",
-            fetchall=True)
-        if rows is not None:
-            for row in rows:
-                cedula, nombre, tipo, activo_int, ausencias, celular, casa = row
-                estado_str = "Activo" if activo_int == 1 else "Inactivo"
-                self.resident_tree.insert("", "end", values=(
-                cedula, nombre, tipo.capitalize(), estado_str, ausencias, celular, casa))
-        self.update_resident_comboboxes()
-
-    def update_resident_comboboxes(self):
-        residents_data = self.execute_query(
-            "SELECT cedula, nombre, casa FROM residentes WHERE activo = 1 ORDER BY nombre", fetchall=True)
-        resident_list = [f"{r[0]}: {r[1]} ({r[2]})" for r in residents_data] if residents_data else []
-        if hasattr(self, 'proxy_giver_combobox'): self.proxy_giver_combobox[
-            'values'] = resident_list; self.proxy_giver_combobox.set('')
-        if hasattr(self, 'proxy_receiver_combobox'): self.proxy_receiver_combobox[
-            'values'] = resident_list; self.proxy_receiver_combobox.set('')
+        # Varias recargas pedidas en el mismo ciclo de eventos (p. ej. guardar y luego desactivar por ausencias)
+        # se juntan en una sola lectura cuando Tk queda ocioso.
+        if self._pending_residents_load is None:
+            self._pending_residents_load = self.root.after_idle(self._start_residents_load)
+
+    def _start_residents_load(self):
+        self._pending_residents_load = None
+        self.query_in_background(SQL_RESIDENTES_TODOS, (), functools.partial(self._show_residents,
+                                                                           self._residents_generation),
+                                 self._resident_view_rows)
+
+    def _invalidate_residents(self):
+        # Tras escribir en residentes: olvida la caché, deja obsoletas las lecturas ya en curso y pide una nueva.
+        self._residents_cache = None
+        self._residents_generation += 1
+        self.load_residents()
+
+    @staticmethod
+    def _resident_view_rows(resident_rows):
+        # Corre en el hilo lector: arma las filas del árbol y las de residentes activos mientras llegan los lotes.
+        rows = []
+        active_rows = []
+        # Las filas vienen ordenadas por 'activo DESC, nombre': los activos ya están en el orden de los combobox.
+        for row in resident_rows:
+            rows.append((row[0], row[:7]))
+            if row[8] == 1: active_rows.append((row[0], row[1], row[6], row[7]))
+        return rows, active_rows
+
+    def _show_residents(self, generation, view_rows):
+        # Una lectura lanzada antes de la última escritura trae datos viejos; la recarga posterior ya está pedida.
+        if generation != self._residents_generation: return
+        rows, active_rows = view_rows
+        self._sync_tree(self.resident_tree, rows)  # iid = cédula
+        self.update_resident_comboboxes(active_rows)
+
+    def get_active_residents(self):
+        # (cedula, nombre, casa, etiqueta) de residentes activos ordenados por nombre, memorizado hasta la próxima escritura.
+        if self._residents_cache is None:
+            self._set_active_residents(self.execute_query(
+                SQL_RESIDENTES_ACTIVOS, fetchall=True) or [])
+        return self._residents_cache
+
+    def _set_active_residents(self, rows):
+        self._residents_display = [row[3] for row in rows]
+        self._residents_ids = [row[0] for row in rows]
+        self._residents_by_id = {cedula: (nombre, casa) for cedula, nombre, casa, _ in rows}
+        self._residents_cache = rows
+
+    def _set_combobox_values(self, combobox, values):
+        values = tuple(values)
+        if self._combobox_values.get(combobox) != values:
+            combobox['values'] = values; self._combobox_values[combobox] = values
+
+    def update_resident_comboboxes(self, active_residents=None):
+        # active_residents: filas (cedula, nombre, casa, etiqueta) ya leídas por quien llama; si no se pasan se usa la caché.
+        if active_residents is not None:
+            self._set_active_residents(active_residents)
+        else:
+            self.get_active_residents()
+        resident_list = self._residents_display
+        self._proxy_combo_ids = self._residents_ids
+        self._set_combobox_values(self.proxy_giver_combobox, resident_list); self.proxy_giver_combobox.set('')
+        self._set_combobox_values(self.proxy_receiver_combobox, resident_list); self.proxy_receiver_combobox.set('')
 
     def toggle_resident_activation(self):
         selected_item = self.resident_tree.focus()
@@ -281,14 +719,14 @@ class App:
         estado_actual_str = values[3]
         nuevo_estado_int = 0 if estado_actual_str == "Activo" else 1;
         accion_str = "desactivar" if nuevo_estado_int == 0 else "activar"
-        reset_ausencias = ", preguntas_consecutivas_sin_votar = 0" if nuevo_estado_int == 1 else ""
         if messagebox.askyesno(f"Confirmar {accion_str.capitalize()}",
                                f"¿{accion_str} a '{nombre_residente}' ({cedula_residente})?"):
             try:
-                self.execute_query(f"UPDATE residentes SET activo = ? {reset_ausencias} WHERE cedula=?",
-                                   (nuevo_estado_int, cedula_residente), commit=True)
+                self.execute_query(SQL_ACTIVAR_RESIDENTE if nuevo_estado_int == 1 else SQL_DESACTIVAR_RESIDENTE,
+                                   (cedula_residente,), commit=True)
+                self._invalidate_residents()
+                self._invalidate_weights()
                 messagebox.showinfo("Éxito", f"Residente '{nombre_residente}' {accion_str}do.")
-                self.load_residents();
                 self.clear_resident_fields()
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo actualizar: {e}")
@@ -353,6 +791,8 @@ class App:
                                                                                                     padx=5);
         ttk.Button(question_button_frame, text="Nueva (Limpiar)", command=self.clear_question_fields).pack(side=tk.LEFT,
                                                                                                            padx=5)
+        ttk.Button(question_button_frame, text="Importar CSV", command=self.import_questions_dialog).pack(side=tk.LEFT,
+                                                                                                          padx=5)
         question_list_frame = ttk.Frame(questions_frame);
         question_list_frame.pack(fill="both", expand=True, pady=5)
         self.questions_tree = ttk.Treeview(question_list_frame,
@@ -378,32 +818,66 @@ class App:
         q_text = self.question_text_entry.get().strip();
         q_options = self.question_options_entry.get().strip()
         if not q_text: messagebox.showerror("Error", "Texto pregunta vacío."); return
-        if not q_options: q_options = "Acepta,No Acepta,En Blanco"
+        q_options = serialize_question_options(q_options)
         if self.editing_question_id:
-            current_state_info = self.execute_query("SELECT estado FROM preguntas WHERE id = ?",
+            try:
+                updated = self.execute_query(SQL_ACTUALIZAR_PREGUNTA, (q_text, q_options, self.editing_question_id,
+                                                                       ESTADO_PREGUNTA_INACTIVA), fetchone=True, commit=True)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo actualizar: {e}"); return
+            if updated:
+                messagebox.showinfo("Éxito", "Pregunta actualizada."); self.clear_question_fields(); self.load_questions_for_voting_tab(self.load_questions_for_assembly())
+                return
+            # No se actualizó: el estado solo se consulta para elegir el mensaje
+            current_state_info = self.execute_query(SQL_ESTADO_PREGUNTA,
                                                     (self.editing_question_id,), fetchone=True)
             if not current_state_info: messagebox.showerror("Error",
                                                             "Pregunta no existe."); self.clear_question_fields(); self.load_questions_for_assembly(); return
-            current_state = current_state_info[0]
-            if current_state != ESTADO_PREGUNTA_INACTIVA: messagebox.showerror("Error Edición",
-                                                                               f"No se puede editar pregunta '{current_state}'."); return
-            try:
-                self.execute_query("UPDATE preguntas SET texto_pregunta = ?, opciones_configuradas = ? WHERE id = ?",
-                                   (q_text, q_options, self.editing_question_id), commit=True); messagebox.showinfo(
-                    "Éxito",
-                    "Pregunta actualizada."); self.clear_question_fields(); self.load_questions_for_assembly(); self.load_questions_for_voting_tab()
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo actualizar: {e}")
+            messagebox.showerror("Error Edición", f"No se puede editar pregunta '{current_state_info[0]}'.")
         else:
             try:
                 self.execute_query(
-                    "INSERT INTO preguntas (asamblea_id, texto_pregunta, opciones_configuradas, estado) VALUES (?, ?, ?, ?)",
+                    SQL_INSERTAR_PREGUNTA,
                     (self.current_assembly_id, q_text, q_options, ESTADO_PREGUNTA_INACTIVA),
                     commit=True); messagebox.showinfo("Éxito",
-                                                      "Pregunta agregada."); self.clear_question_fields(); self.load_questions_for_assembly(); self.load_questions_for_voting_tab()
+                                                      "Pregunta agregada."); self.clear_question_fields(); self.load_questions_for_voting_tab(self.load_questions_for_assembly())
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo agregar: {e}")
 
+    def bulk_insert_questions(self, questions):
+        # Alta en bloque de preguntas (texto, opciones) en la asamblea actual, todas inactivas, en una sola
+        # transacción: o entran todas o ninguna (sqlite3.Error se propaga). import_questions_dialog recarga las listas.
+        if not self.current_assembly_id: raise ValueError("No hay asamblea seleccionada.")
+        return self.execute_many(SQL_INSERTAR_PREGUNTA, (
+            (self.current_assembly_id, texto, serialize_question_options(opciones), ESTADO_PREGUNTA_INACTIVA)
+            for texto, opciones in questions))
+
+    def import_questions_csv(self, path):
+        # CSV con una pregunta por fila: texto y luego cada opción en su propia columna (sin opciones = predeterminadas).
+        # La primera fila se toma como cabecera (y se omite) si su primera columna dice 'texto'/'pregunta'.
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first and first[0].strip().lower() not in ('texto', 'pregunta'): reader = itertools.chain([first], reader)
+            questions = []
+            for row in reader:
+                if not row or not any(value.strip() for value in row): continue
+                if not row[0].strip(): raise ValueError(f"Fila sin texto de pregunta: {row}")
+                questions.append((row[0].strip(), ",".join(row[1:])))
+        return self.bulk_insert_questions(questions)
+
+    def import_questions_dialog(self):
+        if not self.current_assembly_id: messagebox.showerror("Error", "Seleccione asamblea."); return
+        path = filedialog.askopenfilename(title="Importar preguntas",
+                                          filetypes=[("CSV", "*.csv"), ("Todos", "*.*")])
+        if not path: return
+        try:
+            inserted = self.import_questions_csv(path)
+        except (ValueError, OSError, csv.Error, sqlite3.Error) as e:
+            messagebox.showerror("Error", f"Importación cancelada:\n{e}"); return
+        messagebox.showinfo("Éxito", f"{inserted} preguntas importadas.");
+        self.load_questions_for_voting_tab(self.load_questions_for_assembly())
+
     def clear_question_fields(self):
         # (Sin cambios)
         self.editing_question_id = None;
@@ -434,16 +908,24 @@ class App:
             else:
                 self.question_text_entry.config(state='normal'); self.question_options_entry.config(state='normal')
 
+    def get_assembly_questions(self):
+        if not self.current_assembly_id: return []
+        return self.execute_query(SQL_PREGUNTAS_ASAMBLEA, (self.current_assembly_id,), fetchall=True) or []
+
     def load_questions_for_assembly(self):
-        # (Sin cambios)
-        for i in self.questions_tree.get_children(): self.questions_tree.delete(i)
-        if not self.current_assembly_id: return
-        questions_data = self.execute_query(
-            "SELECT id, texto_pregunta, opciones_configuradas, estado FROM preguntas WHERE asamblea_id = ? ORDER BY id",
-            (self.current_assembly_id,), fetchall=True)
-        if questions_data:
-            for q_id, q_text, q_opts, q_estado in questions_data: self.questions_tree.insert("", "end", values=(
-            q_id, q_text, q_opts, q_estado.capitalize()))
+        # Devuelve las filas leídas para que la pestaña de votación las reutilice sin otra consulta.
+        self._assembly_view_dirty = True
+        questions_data = self.get_assembly_questions()
+        self._fill_tree(self.questions_tree, [(q_id, q_text, ",".join(parse_question_options(q_opts)), q_estado.capitalize())
+                                              for q_id, q_text, q_opts, q_estado, _ in questions_data])
+        self._question_tree_iids = dict(zip((q[0] for q in questions_data), self.questions_tree.get_children()))
+        return questions_data
+
+    def _set_question_tree_state(self, question_id, estado):
+        # Cambia solo la celda 'Estado' de la fila, sin recargar todas las preguntas
+        iid = self._question_tree_iids.get(question_id)
+        if iid is not None and self.questions_tree.exists(iid):
+            self.questions_tree.set(iid, column="estado_q", value=estado.capitalize())
 
     def create_assembly(self):
         # (Sin cambios)
@@ -451,112 +933,126 @@ class App:
         descripcion = self.assembly_desc_entry.get()
         if not fecha or not descripcion: messagebox.showerror("Error", "Fecha y descripción obligatorias."); return
         try:
-            self.execute_query("INSERT INTO asambleas (fecha, descripcion) VALUES (?, ?)", (fecha, descripcion),
-                               commit=True); messagebox.showinfo("Éxito",
-                                                                 "Asamblea creada."); self.load_assemblies(); self.assembly_date_entry.delete(
+            new_assembly = self.execute_query(SQL_INSERTAR_ASAMBLEA, (fecha, descripcion), fetchall=True, commit=True)[0]
+            # La fila nueva se ubica en la lista memorizada (mismo orden que SQL_ASAMBLEAS) sin volver a consultarla
+            if self._assemblies_cache is not None:
+                self._assemblies_cache = sorted(self._assemblies_cache + [new_assembly], key=lambda row: (row[1], row[0]),
+                                                reverse=True)
+            messagebox.showinfo("Éxito",
+                                "Asamblea creada."); self.load_assemblies(); self.assembly_date_entry.delete(
                 0, tk.END); self.assembly_desc_entry.delete(0, tk.END)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo crear asamblea: {e}")
 
+    def get_assemblies(self):
+        # (id, fecha, descripcion) de todas las asambleas, memorizado hasta crear una nueva.
+        if self._assemblies_cache is None:
+            self._assemblies_cache = self.execute_query(
+                SQL_ASAMBLEAS, fetchall=True) or []
+        return self._assemblies_cache
+
     def load_assemblies(self):
-        # (Sin cambios)
-        assemblies = self.execute_query("SELECT id, fecha, descripcion FROM asambleas ORDER BY fecha DESC, id DESC",
-                                        fetchall=True)
-        if assemblies is not None:
-            self.assembly_combobox['values'] = [f"{row[0]}: {row[1]} - {row[2]}" for row in assemblies]
-            if assemblies:
-                self.assembly_combobox.current(0); self.on_assembly_selected()
-            else:
-                self.assembly_combobox.set(''); self.current_assembly_id = None; self.clear_assembly_details()
+        assemblies = self.get_assemblies()
+        self._set_combobox_values(self.assembly_combobox, [f"{row[0]}: {row[1]} - {row[2]}" for row in assemblies])
+        self._assembly_combo_ids = [row[0] for row in assemblies]
+        if assemblies:
+            self.assembly_combobox.current(0); self.on_assembly_selected()
         else:
-            self.assembly_combobox['values'] = []; self.assembly_combobox.set(
-                ''); self.current_assembly_id = None; self.clear_assembly_details()
+            self.assembly_combobox.set(''); self.current_assembly_id = None; self.clear_assembly_details()
 
     def clear_assembly_details(self):
-        # (Sin cambios)
-        if hasattr(self, 'proxy_giver_combobox'): self.proxy_giver_combobox.set('')
-        if hasattr(self, 'proxy_receiver_combobox'): self.proxy_receiver_combobox.set('')
-        if hasattr(self, 'powers_tree'):
-            for i in self.powers_tree.get_children(): self.powers_tree.delete(i)
-        if hasattr(self, 'question_text_entry'): self.question_text_entry.delete(0, tk.END)
-        if hasattr(self, 'question_options_entry'):
-            self.question_options_entry.delete(0, tk.END);
-            self.question_options_entry.insert(0, "Acepta,No Acepta,En Blanco")
-        if hasattr(self, 'questions_tree'):
-            for i in self.questions_tree.get_children(): self.questions_tree.delete(i)
+        # Nada que limpiar si no se ha cargado ninguna asamblea desde la última limpieza
+        if not self._assembly_view_dirty: return
+        self._assembly_view_dirty = False
+        self.proxy_giver_combobox.set('');
+        self.proxy_receiver_combobox.set('')
+        self._sync_tree(self.powers_tree, ())
+        self.question_text_entry.delete(0, tk.END)
+        self.question_options_entry.delete(0, tk.END);
+        self.question_options_entry.insert(0, "Acepta,No Acepta,En Blanco")
+        self._clear_tree(self.questions_tree)
         self.clear_voting_area()
 
     def on_assembly_selected(self, event=None):
-        # (Sin cambios)
-        selection = self.assembly_combobox.get()
-        if selection:
-            try:
-                self.current_assembly_id = int(selection.split(":")[0]); self.load_selected_assembly_details()
-            except ValueError:
-                messagebox.showerror("Error",
-                                     "Selección inválida."); self.current_assembly_id = None; self.clear_assembly_details()
+        if self._pending_assembly_load is not None:
+            self.root.after_cancel(self._pending_assembly_load); self._pending_assembly_load = None
+        index = self.assembly_combobox.current()
+        if index >= 0:
+            # Solo la última selección dispara la recarga completa. current_assembly_id cambia recién al recargar:
+            # hasta entonces las acciones siguen escribiendo en la asamblea que muestran los paneles.
+            self._pending_assembly_load = self.root.after(RETARDO_CARGA_ASAMBLEA_MS,
+                                                          self.load_selected_assembly_details,
+                                                          self._assembly_combo_ids[index])
         else:
             self.current_assembly_id = None; self.clear_assembly_details()
 
-    def load_selected_assembly_details(self):
-        # (Sin cambios)
+    def load_selected_assembly_details(self, assembly_id):
+        self._pending_assembly_load = None
+        self.current_assembly_id = assembly_id
         if not self.current_assembly_id: self.clear_assembly_details(); return
         self.execute_query(
-            "UPDATE residentes SET preguntas_consecutivas_sin_votar = 0 WHERE ultima_asamblea_actividad != ? OR ultima_asamblea_actividad IS NULL",
+            SQL_REINICIAR_AUSENCIAS,
             (self.current_assembly_id,), commit=True)
         self.update_resident_comboboxes();
         self.load_proxies_for_assembly();
-        self.load_questions_for_assembly();
-        self.load_questions_for_voting_tab()
+        self.load_questions_for_voting_tab(self.load_questions_for_assembly())
 
     def assign_proxy(self):
         """Asigna poder, verificando que quien da poder sea Representante."""
         if not self.current_assembly_id: messagebox.showerror("Error", "Seleccione asamblea."); return
         giver_selection = self.proxy_giver_combobox.get();
-        receiver_selection = self.proxy_receiver_combobox.get()
-        if not giver_selection or not receiver_selection: messagebox.showerror("Error",
-                                                                               "Seleccione ambos residentes."); return
+        giver_index = self.proxy_giver_combobox.current();
+        receiver_index = self.proxy_receiver_combobox.current()
+        if giver_index < 0 or receiver_index < 0: messagebox.showerror("Error",
+                                                                       "Seleccione ambos residentes."); return
 
         try:
-            cedula_da_poder = giver_selection.split(":")[0].strip()
-            cedula_recibe_poder = receiver_selection.split(":")[0].strip()
+            cedula_da_poder = self._proxy_combo_ids[giver_index]
+            cedula_recibe_poder = self._proxy_combo_ids[receiver_index]
 
             if cedula_da_poder == cedula_recibe_poder: messagebox.showerror("Error",
                                                                             "No puede darse poder a sí mismo."); return
 
             # --- NUEVA VERIFICACIÓN: Solo Representantes dan poder ---
-            giver_info = self.execute_query("SELECT tipo_residente FROM residentes WHERE cedula = ? AND activo = 1",
+            giver_info = self.execute_query(SQL_TIPO_RESIDENTE_ACTIVO,
                                             (cedula_da_poder,), fetchone=True)
             if not giver_info:
                 messagebox.showerror("Error", f"Residente '{giver_selection}' no encontrado o inactivo.");
                 return
             if giver_info[0] != TIPO_RESIDENTE_REPRESENTANTE:
+                nombre, casa = self._residents_by_id[cedula_da_poder]
                 messagebox.showerror("Error de Poder",
-                                     f"'{giver_selection.split(':')[1].strip()}' es '{giver_info[0].capitalize()}' y no puede dar poder. Solo los representantes pueden.")
+                                     f"'{nombre} ({casa})' es '{giver_info[0].capitalize()}' y no puede dar poder. Solo los representantes pueden.")
                 return
             # --- FIN VERIFICACIÓN ---
 
-            self.execute_query(
-                "INSERT INTO poderes (asamblea_id, cedula_da_poder, cedula_recibe_poder) VALUES (?, ?, ?)",
-                (self.current_assembly_id, cedula_da_poder, cedula_recibe_poder), commit=True)
+            if self.execute_query(SQL_PODER_EXISTENTE, (self.current_assembly_id, cedula_da_poder), fetchone=True):
+                messagebox.showerror("Error", "Este residente ya otorgó poder en esta asamblea."); return
+            with self.transaction():
+                self.conn.execute(SQL_INSERTAR_PODER, (self.current_assembly_id, cedula_da_poder, cedula_recibe_poder))
+            self._invalidate_weights(self.current_assembly_id)
             messagebox.showinfo("Éxito", "Poder asignado.");
             self.load_proxies_for_assembly();
             if self.current_question_id: self.load_eligible_voters()  # Actualizar lista de votantes
         except sqlite3.IntegrityError:
             messagebox.showerror("Error", "Este residente ya otorgó poder en esta asamblea.");
-        except ValueError:
+        except IndexError:
             messagebox.showerror("Error", "Selección inválida.");
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo asignar: {e}")
 
     def load_proxies_for_assembly(self):
-        # (Sin cambios)
-        for i in self.powers_tree.get_children(): self.powers_tree.delete(i)
-        if not self.current_assembly_id: return
-        query = """SELECT p.id, r1.cedula || ': ' || r1.nombre, r2.cedula || ': ' || r2.nombre FROM poderes p JOIN residentes r1 ON p.cedula_da_poder = r1.cedula JOIN residentes r2 ON p.cedula_recibe_poder = r2.cedula WHERE p.asamblea_id = ? AND r1.activo = 1 AND r2.activo = 1"""
-        proxies = self.execute_query(query, (self.current_assembly_id,), fetchall=True)
-        if proxies:
-            for p_data in proxies: self.powers_tree.insert("", "end", values=p_data)
+        self._assembly_view_dirty = True
+        if not self.current_assembly_id: self._sync_tree(self.powers_tree, ()); return
+        # Los nombres salen del diccionario de residentes activos (sin JOIN); se omiten poderes con inactivos.
+        self.get_active_residents()
+        by_id = self._residents_by_id
+        proxies = self.execute_query(SQL_PODERES_ASAMBLEA, (self.current_assembly_id,), fetchall=True) or []
+        # iid = id del poder: tras asignar o eliminar uno solo cambia esa fila
+        self._sync_tree(self.powers_tree, [(str(proxy_id), (proxy_id, f"{giver}: {by_id[giver][0]}",
+                                                            f"{receiver}: {by_id[receiver][0]}"))
+                                           for proxy_id, giver, receiver in proxies
+                                           if giver in by_id and receiver in by_id])
 
     def delete_proxy(self):
         # (Sin cambios)
@@ -566,9 +1062,9 @@ class App:
         if messagebox.askyesno("Confirmar", "¿Eliminar poder?"):
             power_id = self.powers_tree.item(selected_item, "values")[0]
             try:
-                self.execute_query("DELETE FROM poderes WHERE id=? AND asamblea_id=?",
-                                   (power_id, self.current_assembly_id), commit=True); messagebox.showinfo("Éxito",
-                                                                                                           "Poder eliminado."); self.load_proxies_for_assembly();
+                self.execute_query(SQL_ELIMINAR_PODER, (power_id, self.current_assembly_id), commit=True)
+                self._invalidate_weights(self.current_assembly_id)
+                messagebox.showinfo("Éxito", "Poder eliminado."); self.load_proxies_for_assembly();
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo eliminar: {e}")
 
@@ -582,6 +1078,10 @@ class App:
         self.voting_question_combobox = ttk.Combobox(question_select_frame, state="readonly", width=70);
         self.voting_question_combobox.pack(side=tk.LEFT, padx=5);
         self.voting_question_combobox.bind("<<ComboboxSelected>>", self.on_voting_question_selected_for_display)
+        ttk.Label(question_select_frame, text="Buscar:").pack(side=tk.LEFT, padx=5);
+        self.question_search_entry = ttk.Entry(question_select_frame, width=15);
+        self.question_search_entry.pack(side=tk.LEFT, padx=5)
+        self.question_search_entry.bind("<KeyRelease>", self.on_question_search_typed)
         button_frame_votacion = ttk.Frame(question_select_frame);
         button_frame_votacion.pack(side=tk.LEFT, padx=10);
         ttk.Button(button_frame_votacion, text="Activar", command=self.activate_question_for_voting).pack(side=tk.TOP,
@@ -595,144 +1095,199 @@ class App:
         ttk.Label(vote_entry_frame, text="Votante Elegible:").grid(row=0, column=0, padx=5, pady=5, sticky="w");
         self.voting_resident_combobox = ttk.Combobox(vote_entry_frame, state="readonly", width=40);
         self.voting_resident_combobox.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        ttk.Label(vote_entry_frame, text="Buscar:").grid(row=0, column=2, padx=5, pady=5, sticky="w");
+        self.voter_search_entry = ttk.Entry(vote_entry_frame, width=15);
+        self.voter_search_entry.grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        self.voter_search_entry.bind("<KeyRelease>", self.on_voter_search_typed)
         ttk.Label(vote_entry_frame, text="Opción Voto:").grid(row=1, column=0, padx=5, pady=5, sticky="nw");
         self.options_radio_frame = ttk.Frame(vote_entry_frame);
         self.options_radio_frame.grid(row=1, column=1, padx=5, pady=5, sticky="ew");
+        self._option_radios = []  # Radiobutton reutilizables de las opciones (ver _show_vote_options)
+        self._options_hint_label = ttk.Label(self.options_radio_frame)
         self.vote_option_var_string = tk.StringVar()
         ttk.Button(vote_entry_frame, text="Registrar Voto", command=self.register_vote).grid(row=2, column=0,
                                                                                              columnspan=2, pady=10);
+        ttk.Button(vote_entry_frame, text="Importar Votos CSV", command=self.import_votes_dialog).grid(row=2, column=2,
+                                                                                                       columnspan=2, pady=10);
         vote_entry_frame.grid_columnconfigure(1, weight=1)
         results_frame = ttk.LabelFrame(frame, text="Resultados Pregunta", padding=10);
         results_frame.pack(padx=10, pady=10, fill="both", expand=True);
         self.results_display_frame = results_frame;
-        self.results_canvas_widget = None
-
-    def load_questions_for_voting_tab(self):
-        if not self.current_assembly_id: self.voting_question_combobox[
-            'values'] = []; self.voting_question_combobox.set(''); self.clear_voting_area(); return
-        questions = self.execute_query("SELECT id, texto_pregunta FROM preguntas WHERE asamblea_id = ? ORDER BY id",
-                                       (self.current_assembly_id,), fetchall=True)
-        if questions is not None:
-            self.voting_question_combobox['values'] = [f"{q[0]}: {q[1]}" for q in questions]
-            if questions:
-                self.voting_question_combobox.current(0); self.on_voting_question_selected_for_display()
-            else:
-                self.voting_question_combobox.set(''); self.clear_voting_area();
+        # La figura se crea en _ensure_results_chart la primera vez que hay algo que graficar
+        self.results_fig = self.results_ax = self.results_canvas = self.results_canvas_widget = None
+
+    def _ensure_results_chart(self):
+        # matplotlib se importa aquí y no al arrancar; figura y canvas se crean una sola vez y luego
+        # cada refresco solo limpia y redibuja los ejes.
+        if self.results_fig is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.results_fig = Figure(figsize=(6, 4.5));
+            self.results_ax = self.results_fig.add_subplot(111);
+            self.results_fig.subplots_adjust(left=0.05, right=0.65, top=0.9, bottom=0.05)
+            self.results_canvas = FigureCanvasTkAgg(self.results_fig, master=self.results_display_frame);
+            self.results_canvas_widget = self.results_canvas.get_tk_widget()
+        return self.results_fig, self.results_ax
+
+    def clear_results_display(self):
+        # Oculta el gráfico (sin destruirlo) y elimina los mensajes anteriores
+        self._last_results_state = None
+        if self.results_fig is not None:
+            self.results_ax.clear();
+            self.results_canvas_widget.pack_forget()
+        if self.results_display_frame.winfo_exists():
+            for widget in self.results_display_frame.winfo_children():
+                if widget != self.results_canvas_widget: widget.destroy()
+
+    def load_questions_for_voting_tab(self, questions=None):
+        # questions: filas de SQL_PREGUNTAS_ASAMBLEA ya leídas por quien llama; si no se pasan se consultan.
+        self._assembly_view_dirty = True
+        if questions is None: questions = self.get_assembly_questions()
+        self._voting_questions = questions
+        self._voting_question_options = {q[0]: parse_question_options(q[2]) for q in questions}
+        if self._filter_voting_questions():
+            self.voting_question_combobox.current(0); self.on_voting_question_selected_for_display()
+        elif questions:
+            # Solo el filtro no deja nada: la pregunta activa (current_question_id) sigue vigente
+            self.voting_question_combobox.set('')
         else:
-            self.voting_question_combobox['values'] = []; self.voting_question_combobox.set(
-                ''); self.clear_voting_area()
+            self.voting_question_combobox.set(''); self.clear_voting_area()
+
+    def _filter_voting_questions(self):
+        # Deja en el combobox solo las primeras preguntas que coinciden con la búsqueda; devuelve cuántas quedaron.
+        search = self.question_search_entry.get().strip().casefold()
+        matches = list(itertools.islice((q for q in self._voting_questions if not search or search in q[4].casefold()),
+                                        LIMITE_PREGUNTAS_COMBOBOX))
+        self._voting_question_ids = [q[0] for q in matches]
+        self._voting_question_texts = [q[1] for q in matches]
+        self._set_combobox_values(self.voting_question_combobox, [q[4] for q in matches])
+        return len(matches)
+
+    def on_question_search_typed(self, event=None):
+        # Igual que la búsqueda de votantes: filtra cuando se deja de teclear
+        if self._pending_question_search is not None: self.root.after_cancel(self._pending_question_search)
+        self._pending_question_search = self.root.after(RETARDO_BUSQUEDA_VOTANTE_MS, self._show_voting_questions)
+
+    def _show_voting_questions(self):
+        # Conserva la pregunta seleccionada si sigue en la lista filtrada; si no, muestra la primera coincidencia.
+        self._pending_question_search = None
+        index = self.voting_question_combobox.current()
+        selected_id = self._voting_question_ids[index] if index >= 0 else None
+        if not self._filter_voting_questions():
+            self.voting_question_combobox.set('')
+        elif selected_id in self._voting_question_ids:
+            self.voting_question_combobox.current(self._voting_question_ids.index(selected_id))
+        else:
+            self.voting_question_combobox.current(0); self.on_voting_question_selected_for_display()
 
     def clear_voting_area(self):
         self.current_question_id = None;
         self.current_question_options = []
-        if hasattr(self, 'active_question_label'): self.active_question_label.config(text="Pregunta Activa: Ninguna")
-        if hasattr(self, 'voting_resident_combobox'): self.voting_resident_combobox.set('');
-        self.voting_resident_combobox['values'] = []
-        if hasattr(self, 'vote_option_var_string'): self.vote_option_var_string.set("")
-        if hasattr(self, 'options_radio_frame') and self.options_radio_frame.winfo_exists():
-            for widget in self.options_radio_frame.winfo_children(): widget.destroy()
-        if hasattr(self,
-                   'results_canvas_widget') and self.results_canvas_widget: self.results_canvas_widget.destroy(); self.results_canvas_widget = None
-        if hasattr(self, 'results_display_frame') and self.results_display_frame.winfo_exists():
-            for widget in self.results_display_frame.winfo_children():
-                if widget != self.results_canvas_widget: widget.destroy()
+        self.active_question_label.config(text="Pregunta Activa: Ninguna")
+        self.voting_resident_combobox.set('');
+        self._set_combobox_values(self.voting_resident_combobox, ())
+        self.vote_option_var_string.set("")
+        self._show_vote_options(())
+        self.clear_results_display()
 
     def on_voting_question_selected_for_display(self, event=None):
-        selection = self.voting_question_combobox.get()
-        if selection:
-            try:
-                question_id_to_display = int(selection.split(":")[0])
-                if question_id_to_display != self.current_question_id:
-                    self.update_vote_options_ui(question_id_to_display, for_display_only=True)
-                else:
-                    self.update_vote_options_ui(question_id_to_display, for_display_only=False)
-                self.display_vote_results_for_question(question_id_to_display)
-            except ValueError:
-                messagebox.showerror("Error", "Selección inválida.")
+        index = self.voting_question_combobox.current()
+        if index >= 0:
+            question_id_to_display = self._voting_question_ids[index]
+            if question_id_to_display != self.current_question_id:
+                self.update_vote_options_ui(question_id_to_display, for_display_only=True)
+            else:
+                self.update_vote_options_ui(question_id_to_display, for_display_only=False)
+            self.display_vote_results_for_question(question_id_to_display)
 
     def update_vote_options_ui(self, question_id, for_display_only=False):
-        if hasattr(self, 'options_radio_frame') and self.options_radio_frame.winfo_exists():
-            for widget in self.options_radio_frame.winfo_children(): widget.destroy()
-        self.current_question_options = []
-        question_data = self.execute_query("SELECT opciones_configuradas FROM preguntas WHERE id = ?", (question_id,),
-                                           fetchone=True)
-        if question_data and question_data[0]:
-            self.current_question_options = [opt.strip() for opt in question_data[0].split(',')]
-        else:
-            self.current_question_options = ["Acepta", "No Acepta", "En Blanco"]
-        if hasattr(self, 'vote_option_var_string'): self.vote_option_var_string.set("")
+        # Las opciones llegan con la lista de preguntas (que se recarga al editarlas); solo se consulta si falta la pregunta.
+        options = self._voting_question_options.get(question_id)
+        if options is None:
+            question_data = self.execute_query(SQL_OPCIONES_PREGUNTA, (question_id,), fetchone=True)
+            options = parse_question_options(question_data[0] if question_data else None)
+        self.current_question_options = options
+        self.vote_option_var_string.set("")
         if not for_display_only or self.current_question_id == question_id:
-            for option_text in self.current_question_options:
-                rb = ttk.Radiobutton(self.options_radio_frame, text=option_text, variable=self.vote_option_var_string,
-                                     value=option_text)
-                rb.pack(anchor=tk.W, pady=2)
+            self._show_vote_options(self.current_question_options)
         elif not self.current_question_id and for_display_only:
-            if hasattr(self, 'options_radio_frame') and self.options_radio_frame.winfo_exists():
-                ttk.Label(self.options_radio_frame, text="Opciones se mostrarán al activar.").pack(anchor=tk.W)
+            self._show_vote_options((), hint="Opciones se mostrarán al activar.")
+        else:
+            self._show_vote_options(())
+
+    def _show_vote_options(self, options, hint=None):
+        # Los Radiobutton se reutilizan entre preguntas: se reconfiguran los necesarios y se ocultan los sobrantes;
+        # solo se crean nuevos si la pregunta tiene más opciones que las mostradas hasta ahora.
+        pool = self._option_radios
+        for index, option_text in enumerate(options):
+            if index == len(pool):
+                pool.append(ttk.Radiobutton(self.options_radio_frame, variable=self.vote_option_var_string))
+            pool[index].configure(text=option_text, value=option_text)
+            pool[index].pack(anchor=tk.W, pady=2)
+        for rb in pool[len(options):]: rb.pack_forget()
+        if hint:
+            self._options_hint_label.configure(text=hint); self._options_hint_label.pack(anchor=tk.W)
+        else:
+            self._options_hint_label.pack_forget()
 
     def activate_question_for_voting(self):
-        selection = self.voting_question_combobox.get();
-        if not selection: messagebox.showerror("Error", "Seleccione pregunta."); return
+        index = self.voting_question_combobox.current();
+        if index < 0: messagebox.showerror("Error", "Seleccione pregunta."); return
         if not self.current_assembly_id: messagebox.showerror("Error", "Seleccione asamblea."); return
-        try:
-            new_active_question_id = int(selection.split(":")[0])
-        except ValueError:
-            messagebox.showerror("Error", "Selección inválida."); return
-        q_info = self.execute_query("SELECT estado FROM preguntas WHERE id = ?", (new_active_question_id,),
+        new_active_question_id = self._voting_question_ids[index]
+        q_info = self.execute_query(SQL_ESTADO_PREGUNTA, (new_active_question_id,),
                                     fetchone=True)
         if not q_info: messagebox.showerror("Error", "Pregunta no encontrada."); return
         if q_info[0] != ESTADO_PREGUNTA_INACTIVA: messagebox.showwarning("Advertencia",
                                                                          f"Pregunta ya está '{q_info[0].capitalize()}'."); return
-        if self.current_question_id is not None and self.current_question_id != new_active_question_id:
-            self.execute_query("UPDATE preguntas SET estado = ? WHERE id = ? AND asamblea_id = ?",
-                               (ESTADO_PREGUNTA_CERRADA, self.current_question_id, self.current_assembly_id),
-                               commit=True)
-        self.execute_query("UPDATE preguntas SET estado = ? WHERE id = ? AND asamblea_id = ?",
-                           (ESTADO_PREGUNTA_ACTIVA, new_active_question_id, self.current_assembly_id), commit=True)
+        self.execute_batch([(SQL_ACTIVAR_PREGUNTA, (new_active_question_id, new_active_question_id,
+                                                    self.current_question_id, self.current_assembly_id))])
+        if self.current_question_id not in (None, new_active_question_id):
+            self._set_question_tree_state(self.current_question_id, ESTADO_PREGUNTA_CERRADA)
+        self._set_question_tree_state(new_active_question_id, ESTADO_PREGUNTA_ACTIVA)
         self.current_question_id = new_active_question_id;
-        question_text = selection.split(":", 1)[1].strip()
+        question_text = self._voting_question_texts[index]
         self.active_question_label.config(text=f"Pregunta Activa (ID: {self.current_question_id}): {question_text}")
         self.update_vote_options_ui(self.current_question_id, for_display_only=False);
         self.load_eligible_voters();
         self.display_vote_results_for_question(self.current_question_id);
-        self.load_questions_for_assembly()
         messagebox.showinfo("Votación Activada", f"Pregunta '{question_text}' activa.")
 
     def close_current_question_voting(self):
         # (Sin cambios)
         if not self.current_question_id: messagebox.showwarning("Advertencia", "Ninguna pregunta activa."); return
         question_id_to_close = self.current_question_id
-        q_info = self.execute_query("SELECT texto_pregunta FROM preguntas WHERE id = ?", (question_id_to_close,),
+        q_info = self.execute_query(SQL_TEXTO_PREGUNTA, (question_id_to_close,),
                                     fetchone=True);
         question_text_closed = q_info[0] if q_info else f"ID {question_id_to_close}"
-        deactivated_residents = self.check_and_deactivate_non_voters(question_id_to_close)
+        # Inasistencias y cierre de la pregunta en una sola transacción
+        with self.transaction():
+            deactivated_residents = self.check_and_deactivate_non_voters(question_id_to_close)
+            self.execute_query(SQL_CAMBIAR_ESTADO_PREGUNTA,
+                               (ESTADO_PREGUNTA_CERRADA, question_id_to_close,), commit=True);
         if deactivated_residents: messagebox.showinfo("Residentes Desactivados",
                                                       f"Desactivados por {LIMITE_INASISTENCIAS_VOTO} ausencias:\n- " + "\n- ".join(
                                                           deactivated_residents)); self.load_residents()
-        self.execute_query("UPDATE preguntas SET estado = ? WHERE id = ?",
-                           (ESTADO_PREGUNTA_CERRADA, question_id_to_close,), commit=True);
-        self.load_questions_for_assembly()
+        self._set_question_tree_state(question_id_to_close, ESTADO_PREGUNTA_CERRADA)
         messagebox.showinfo("Votación Cerrada", f"Se cerró votación para: '{question_text_closed}'.");
         self.display_vote_results_for_question(question_id_to_close, final=True)
         self.current_question_id = None;
         self.current_question_options = []
         self.active_question_label.config(text="Pregunta Activa: Ninguna");
         self.voting_resident_combobox.set('');
-        self.voting_resident_combobox['values'] = [];
+        self._set_combobox_values(self.voting_resident_combobox, ());
         self.vote_option_var_string.set("")
-        if hasattr(self, 'options_radio_frame') and self.options_radio_frame.winfo_exists():
-            for widget in self.options_radio_frame.winfo_children(): widget.destroy()
+        self._show_vote_options(())
 
     def check_and_deactivate_non_voters(self, closed_question_id):
         # (Sin cambios)
         if not self.current_assembly_id: return []
         eligible_cedulas = self._get_eligible_voter_cedulas()
         if not eligible_cedulas: return []
-        voters_cedulas = {row[0] for row in self.execute_query("SELECT cedula_votante FROM votos WHERE pregunta_id = ?",
+        voters_cedulas = {row[0] for row in self.execute_query(SQL_VOTANTES_PREGUNTA,
                                                                (closed_question_id,), fetchall=True) or []}
-        resident_inactivity_data = self.execute_query(
-            f"SELECT cedula, preguntas_consecutivas_sin_votar, ultima_asamblea_actividad FROM residentes WHERE cedula IN ({','.join('?' * len(eligible_cedulas))})",
-            list(eligible_cedulas), fetchall=True)
+        resident_inactivity_data = self.execute_query(SQL_INASISTENCIA_RESIDENTES, (json.dumps(list(eligible_cedulas)),),
+                                                      fetchall=True)
         if not resident_inactivity_data: return []
         inactivity_map = {row[0]: {'count': row[1], 'last_assembly': row[2]} for row in resident_inactivity_data}
         deactivated_list = [];
@@ -748,63 +1303,55 @@ class App:
                 new_count = current_count + 1 if last_assembly == self.current_assembly_id else 1
                 new_active_status = 0 if new_count >= LIMITE_INASISTENCIAS_VOTO else 1
                 if new_active_status == 0: res_name = self.execute_query(
-                    "SELECT nombre FROM residentes WHERE cedula = ?", (cedula,),
+                    SQL_NOMBRE_RESIDENTE, (cedula,),
                     fetchone=True); deactivated_list.append(f"{res_name[0] if res_name else '??'} ({cedula})"); print(
                     f"INFO: Residente {cedula} desactivado.")
                 updates_to_make.append((cedula, new_count, self.current_assembly_id, new_active_status))
         if updates_to_make:
-            conn = sqlite3.connect(DB_NAME);
-            cursor = conn.cursor()
-            try:
-                cursor.executemany(
-                    "UPDATE residentes SET preguntas_consecutivas_sin_votar = ?, ultima_asamblea_actividad = ?, activo = ? WHERE cedula = ?",
-                    [(upd[1], upd[2], upd[3], upd[0]) for upd in updates_to_make]); conn.commit(); print(
-                    f"INFO: Actualizado estado inasistencia para {len(updates_to_make)}.")
-            except sqlite3.Error as e:
-                print(f"ERROR actualizando inasistencias: {e}"); conn.rollback()
-            finally:
-                conn.close()
+            # sqlite3.Error se propaga: deshace también el cierre de la pregunta (misma transacción) y no se
+            # anuncian desactivaciones que no ocurrieron.
+            self.execute_many(SQL_ACTUALIZAR_INASISTENCIA,
+                              [(upd[1], upd[2], upd[3], upd[0]) for upd in updates_to_make])
+            self._invalidate_residents()
+            self._invalidate_weights()
+            print(f"INFO: Actualizado estado inasistencia para {len(updates_to_make)}.")
         return deactivated_list
 
     def _get_eligible_voter_cedulas(self):
-        # (Lógica actualizada para 1 voto/unidad)
+        # (1 voto por unidad; ver SQL_VOTANTES_ELEGIBLES)
         if not self.current_assembly_id: return set()
-        all_residents = self.execute_query("SELECT cedula, tipo_residente, casa FROM residentes WHERE activo = 1",
-                                           fetchall=True)
-        if not all_residents: return set()
-        cedulas_dieron_poder = {row[0] for row in
-                                self.execute_query("SELECT cedula_da_poder FROM poderes WHERE asamblea_id = ?",
-                                                   (self.current_assembly_id,), fetchall=True) or []}
-        cedulas_recibieron_poder = {row[0] for row in
-                                    self.execute_query("SELECT cedula_recibe_poder FROM poderes WHERE asamblea_id = ?",
-                                                       (self.current_assembly_id,), fetchall=True) or []}
-        eligible_cedulas = set();
-        casas_con_representante_elegible = set()
-        for cedula, tipo, casa in all_residents:
-            if cedula in cedulas_dieron_poder: continue
-            if tipo == TIPO_RESIDENTE_REPRESENTANTE and casa not in casas_con_representante_elegible:
-                eligible_cedulas.add(cedula);
-                casas_con_representante_elegible.add(casa)
-        for cedula, tipo, casa in all_residents:
-            if cedula in cedulas_dieron_poder: continue
-            if tipo == TIPO_RESIDENTE_ASISTENTE and cedula in cedulas_recibieron_poder:
-                if casa not in casas_con_representante_elegible and cedula not in eligible_cedulas:
-                    eligible_cedulas.add(cedula)
-        return eligible_cedulas
+        return {row[0] for row in self.execute_query(SQL_VOTANTES_ELEGIBLES, {"asamblea": self.current_assembly_id},
+                                                     fetchall=True) or []}
 
     def load_eligible_voters(self):
-        # (Sin cambios)
-        self.voting_resident_combobox['values'] = [];
-        self.voting_resident_combobox.set('')
-        if not self.current_assembly_id: return
-        eligible_cedulas = self._get_eligible_voter_cedulas()
-        if not eligible_cedulas: return
-        eligible_details = self.execute_query(
-            f"SELECT cedula, nombre, casa FROM residentes WHERE cedula IN ({','.join('?' * len(eligible_cedulas))}) ORDER BY nombre",
-            list(eligible_cedulas), fetchall=True)
-        eligible_voters_list = [f"{r[0]}: {r[1]} ({r[2]})" for r in eligible_details] if eligible_details else []
-        self.voting_resident_combobox['values'] = eligible_voters_list
-        if eligible_voters_list:
+        cached = self._eligible_voters_cache.get(self.current_assembly_id)
+        if cached is None:
+            eligible_cedulas = self._get_eligible_voter_cedulas()
+            cached = ([], [])
+            if eligible_cedulas:
+                self.get_active_residents()
+                for cedula, display in zip(self._residents_ids, self._residents_display):
+                    if cedula in eligible_cedulas:
+                        cached[0].append(cedula); cached[1].append(display)
+            if self.current_assembly_id: self._eligible_voters_cache[self.current_assembly_id] = cached
+        self._eligible_voters = cached
+        self._show_eligible_voters()
+
+    def on_voter_search_typed(self, event=None):
+        # Filtra cuando se deja de teclear, no en cada tecla
+        if self._pending_voter_search is not None: self.root.after_cancel(self._pending_voter_search)
+        self._pending_voter_search = self.root.after(RETARDO_BUSQUEDA_VOTANTE_MS, self._show_eligible_voters)
+
+    def _show_eligible_voters(self):
+        # El combobox solo recibe las primeras coincidencias con la búsqueda (cédula, nombre o casa), no el padrón entero.
+        self._pending_voter_search = None
+        search = self.voter_search_entry.get().strip().casefold()
+        ids, displays = self._eligible_voters
+        matches = [(cedula, display) for cedula, display in zip(ids, displays)
+                   if not search or search in display.casefold()][:LIMITE_SUGERENCIAS_VOTANTES]
+        self._voting_resident_ids = [cedula for cedula, _ in matches]
+        self._set_combobox_values(self.voting_resident_combobox, [display for _, display in matches])
+        if matches:
             self.voting_resident_combobox.current(0)
         else:
             self.voting_resident_combobox.set('')
@@ -812,134 +1359,179 @@ class App:
     def register_vote(self):
         # (Sin cambios)
         if not self.current_question_id: messagebox.showerror("Error", "Ninguna pregunta activa."); return
-        voter_selection = self.voting_resident_combobox.get();
+        voter_index = self.voting_resident_combobox.current();
         opcion_elegida_str = self.vote_option_var_string.get()
-        if not voter_selection: messagebox.showerror("Error", "Seleccione votante."); return
+        if voter_index < 0: messagebox.showerror("Error", "Seleccione votante."); return
         if not opcion_elegida_str: messagebox.showerror("Error", "Seleccione opción."); return
         try:
-            cedula_votante = voter_selection.split(":")[0].strip()
-            existing_vote = self.execute_query("SELECT id FROM votos WHERE pregunta_id = ? AND cedula_votante = ?",
+            cedula_votante = self._voting_resident_ids[voter_index]
+            existing_vote = self.execute_query(SQL_VOTO_EXISTENTE,
                                                (self.current_question_id, cedula_votante), fetchone=True)
-            if existing_vote:
-                if messagebox.askyesno("Confirmar Cambio", "Ya votó. ¿Cambiar voto?"):
-                    self.execute_query(
-                        "UPDATE votos SET opcion_elegida = ? WHERE pregunta_id = ? AND cedula_votante = ?",
-                        (opcion_elegida_str, self.current_question_id, cedula_votante), commit=True);
-                    messagebox.showinfo("Éxito", "Voto actualizado.")
-                else:
-                    return
-            else:
-                self.execute_query("INSERT INTO votos (pregunta_id, cedula_votante, opcion_elegida) VALUES (?, ?, ?)",
-                                   (self.current_question_id, cedula_votante, opcion_elegida_str), commit=True);
-                messagebox.showinfo("Éxito", "Voto registrado.")
-            self.execute_query(
-                "UPDATE residentes SET preguntas_consecutivas_sin_votar = 0, ultima_asamblea_actividad = ? WHERE cedula = ?",
-                (self.current_assembly_id, cedula_votante), commit=True)
-            self.display_vote_results_for_question(self.current_question_id);
+            # La consulta previa solo sirve para pedir confirmación; la escritura es un único upsert.
+            if existing_vote and not messagebox.askyesno("Confirmar Cambio", "Ya votó. ¿Cambiar voto?"): return
+            # Voto y marca de actividad del residente en la misma transacción
+            self.execute_batch([
+                (SQL_GUARDAR_VOTO, (self.current_question_id, cedula_votante, opcion_elegida_str)),
+                (SQL_MARCAR_RESIDENTE_VOTO, (self.current_assembly_id, cedula_votante))])
+            messagebox.showinfo("Éxito", "Voto actualizado." if existing_vote else "Voto registrado.")
+            self.schedule_results_refresh()
             self.vote_option_var_string.set("")
-        except ValueError:
+        except IndexError:
             messagebox.showerror("Error", "Selección inválida.")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo registrar: {e}")
 
+    def bulk_register_votes(self, votes):
+        # Carga en bloque de votos (pregunta_id, cedula_votante, opcion_elegida) de la asamblea actual, p. ej. desde
+        # un acta en papel: mismo upsert y marca de actividad que register_vote, todo en una sola transacción y
+        # por lotes de LOTE_IMPORTACION_VOTOS leídos del iterable a medida que se consumen. Igual que register_vote,
+        # solo acepta preguntas activas de la asamblea, votantes elegibles y opciones de la pregunta: si no, ValueError.
+        # En cualquier error (ValueError o sqlite3.Error) se deshace la transacción y no queda ningún voto a medias.
+        votes = iter(votes)
+        total = 0
+        with self.transaction():
+            active_questions = {row[0]: parse_question_options(row[1]) for row in self.execute_query(
+                SQL_PREGUNTAS_ASAMBLEA_ESTADO, (self.current_assembly_id, ESTADO_PREGUNTA_ACTIVA), fetchall=True)}
+            eligible_cedulas = self._get_eligible_voter_cedulas()
+            while batch := list(itertools.islice(votes, LOTE_IMPORTACION_VOTOS)):
+                for pregunta_id, cedula, opcion in batch:
+                    if pregunta_id not in active_questions: raise ValueError(
+                        f"Pregunta {pregunta_id} no está activa en esta asamblea.")
+                    if cedula not in eligible_cedulas: raise ValueError(f"Votante '{cedula}' no es elegible.")
+                    if opcion not in active_questions[pregunta_id]: raise ValueError(
+                        f"Opción '{opcion}' no existe en la pregunta {pregunta_id}.")
+                self.conn.executemany(SQL_GUARDAR_VOTO, batch)
+                self.conn.executemany(SQL_MARCAR_RESIDENTE_VOTO,
+                                      [(self.current_assembly_id, cedula) for _, cedula, _ in batch])
+                total += len(batch)
+        if self.current_question_id: self.schedule_results_refresh()
+        return total
+
+    @staticmethod
+    def _csv_row_to_vote(row):
+        if len(row) < 3 or not all(value.strip() for value in row[:3]): raise ValueError(f"Fila incompleta: {row}")
+        pregunta, cedula, opcion = (value.strip() for value in row[:3])
+        if not pregunta.isdigit(): raise ValueError(f"Id de pregunta inválido en fila: {row}")
+        return int(pregunta), cedula, opcion
+
+    def import_votes_csv(self, path):
+        # CSV con columnas pregunta_id, cedula, opcion (p. ej. transcripción de un acta en papel).
+        # La primera fila se toma como cabecera (y se omite) si su primera columna dice 'pregunta'/'pregunta_id'.
+        # Las filas se leen a medida que bulk_register_votes las consume por lotes.
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first and first[0].strip().lower() not in ('pregunta', 'pregunta_id'): reader = itertools.chain([first], reader)
+            return self.bulk_register_votes(self._csv_row_to_vote(row) for row in reader if row)
+
+    def import_votes_dialog(self):
+        if not self.current_assembly_id: messagebox.showerror("Error", "Seleccione asamblea."); return
+        path = filedialog.askopenfilename(title="Importar votos",
+                                          filetypes=[("CSV", "*.csv"), ("Todos", "*.*")])
+        if not path: return
+        try:
+            inserted = self.import_votes_csv(path)
+        except (ValueError, OSError, csv.Error, sqlite3.Error) as e:
+            messagebox.showerror("Error", f"Importación cancelada:\n{e}"); return
+        messagebox.showinfo("Éxito", f"{inserted} votos importados.")
+
+    def schedule_results_refresh(self):
+        # Agrupa los redibujos pedidos mientras hay uno pendiente; al dispararse usa los votos más recientes.
+        if self._pending_results_refresh is None:
+            self._pending_results_refresh = self.root.after(RETARDO_REFRESCO_RESULTADOS_MS, self._refresh_results)
+
+    def _refresh_results(self):
+        self._pending_results_refresh = None
+        if self.current_question_id: self.display_vote_results_for_question(self.current_question_id)
+
     def get_voting_weights(self):
-        # (Lógica actualizada para 1 voto/unidad + poderes)
+        # {cedula: peso} en una sola consulta (ver SQL_PESOS_VOTO_CTE: 1 voto por unidad + poderes recibidos),
+        # memorizado por asamblea hasta que cambien sus poderes o los residentes.
         if not self.current_assembly_id: return {}
-        weights = {};
-        all_residents_info = self.execute_query("SELECT cedula, tipo_residente, casa FROM residentes WHERE activo = 1",
-                                                fetchall=True)
-        if not all_residents_info: return {}
-        cedulas_dieron_poder = {row[0] for row in
-                                self.execute_query("SELECT cedula_da_poder FROM poderes WHERE asamblea_id = ?",
-                                                   (self.current_assembly_id,), fetchall=True) or []}
-        casas_con_representante_asignado = set()
-        for cedula, tipo, casa in all_residents_info:
-            if cedula not in cedulas_dieron_poder:
-                if tipo == TIPO_RESIDENTE_REPRESENTANTE and casa not in casas_con_representante_asignado:
-                    weights[cedula] = 1;
-                    casas_con_representante_asignado.add(casa)
-                elif tipo == TIPO_RESIDENTE_ASISTENTE:
-                    weights[cedula] = 0
-        proxies_received = self.execute_query(
-            """SELECT cedula_recibe_poder, COUNT(cedula_da_poder) FROM poderes WHERE asamblea_id = ? GROUP BY cedula_recibe_poder""",
-            (self.current_assembly_id,), fetchall=True)
-        if proxies_received:
-            for receiver_cedula, count in proxies_received:
-                if receiver_cedula in weights: weights[receiver_cedula] += count
+        weights = self._weights_cache.get(self.current_assembly_id)
+        if weights is None:
+            weights = dict(self.execute_query(SQL_PESOS_VOTO, {"asamblea": self.current_assembly_id},
+                                              fetchall=True) or [])
+            self._weights_cache[self.current_assembly_id] = weights
         return weights
 
+    def _invalidate_weights(self, assembly_id=None):
+        # Pesos y votantes elegibles dependen de lo mismo (poderes y residentes activos).
+        # Sin asamblea: cambió la tabla de residentes y todo queda obsoleto.
+        if assembly_id is None:
+            self._weights_cache.clear(); self._eligible_voters_cache.clear()
+        else:
+            self._weights_cache.pop(assembly_id, None); self._eligible_voters_cache.pop(assembly_id, None)
+
     def display_vote_results_for_question(self, question_id_for_results, final=False):
         # (Sin cambios)
         if not self.current_assembly_id: messagebox.showwarning("Advertencia",
                                                                 "No hay asamblea."); self.clear_voting_area(); return
         if not question_id_for_results: self.clear_voting_area(); return
-        if hasattr(self,
-                   'results_canvas_widget') and self.results_canvas_widget: self.results_canvas_widget.destroy(); self.results_canvas_widget = None
-        if hasattr(self, 'results_display_frame') and self.results_display_frame.winfo_exists():
-            for widget in self.results_display_frame.winfo_children(): widget.destroy()
-        votes_data = self.execute_query("SELECT cedula_votante, opcion_elegida FROM votos WHERE pregunta_id = ?",
-                                        (question_id_for_results,), fetchall=True)
-        q_info = self.execute_query("SELECT texto_pregunta, estado, opciones_configuradas FROM preguntas WHERE id = ?",
-                                    (question_id_for_results,), fetchone=True)
+        results_rows = self.execute_query(SQL_CONTEO_VOTOS, {"asamblea": self.current_assembly_id,
+                                                             "pregunta": question_id_for_results}, fetchall=True)
+        q_info = results_rows[0][:3] if results_rows else None
+        vote_tally = [row[3:] for row in results_rows if row[3] is not None]
+        total_possible_weight_in_assembly = sum(self.get_voting_weights().values());
+        # Mismos votos, pesos y estado que lo ya dibujado: no se rehace el gráfico
+        results_state = (self.current_assembly_id, question_id_for_results, final, q_info, tuple(vote_tally or ()),
+                         total_possible_weight_in_assembly)
+        if results_state == self._last_results_state: return
+        self.clear_results_display()
+        self._last_results_state = results_state
         if not q_info:
-            if hasattr(self.results_display_frame,
-                       'winfo_exists') and self.results_display_frame.winfo_exists(): ttk.Label(
+            if self.results_display_frame.winfo_exists(): ttk.Label(
                 self.results_display_frame, text=f"Pregunta ID {question_id_for_results} no encontrada.").pack(pady=20)
             return
         q_text, q_estado, q_options_str = q_info;
-        q_options_list = [opt.strip() for opt in q_options_str.split(',')] if q_options_str else ["Acepta", "No Acepta",
-                                                                                                  "En Blanco"]
-        if not votes_data:
-            if hasattr(self.results_display_frame,
-                       'winfo_exists') and self.results_display_frame.winfo_exists(): ttk.Label(
+        q_options_list = parse_question_options(q_options_str)
+        if not vote_tally:
+            if self.results_display_frame.winfo_exists(): ttk.Label(
                 self.results_display_frame, text=f"Sin votos para:\n'{q_text}'").pack(pady=20)
             return
-        voting_weights_for_assembly = self.get_voting_weights();
-        weighted_results = Counter()
-        for cedula_votante, opcion_elegida_text in votes_data: weight_of_this_voter_event = voting_weights_for_assembly.get(
-            cedula_votante, 0); weighted_results[opcion_elegida_text] += weight_of_this_voter_event
-        total_weighted_votes_cast = sum(weighted_results.values());
-        chart_labels = [];
-        chart_sizes = [];
-        raw_counts_display = Counter()
-        for option_text_label in q_options_list:
-            total_weight_for_option = weighted_results[option_text_label];
-            count_for_option = sum(1 for _, o_elegida in votes_data if o_elegida == option_text_label);
-            raw_counts_display[option_text_label] = count_for_option
-            percentage = (
-                                     total_weight_for_option / total_weighted_votes_cast) * 100 if total_weighted_votes_cast > 0 else 0;
-            chart_labels.append(f"{option_text_label}\n({total_weight_for_option} p, {percentage:.1f}%)");
-            chart_sizes.append(total_weight_for_option)
-        if not chart_sizes or all(s == 0 for s in chart_sizes):
-            if hasattr(self.results_display_frame,
-                       'winfo_exists') and self.results_display_frame.winfo_exists(): ttk.Label(
+        tally_by_option = {opcion: (count, peso) for opcion, count, peso in vote_tally}
+        total_weighted_votes_cast = sum(peso for _, _, peso in vote_tally);
+        # Vectores alineados con q_options_list (peso, votantes y % por opción)
+        option_tallies = [tally_by_option.get(option_text, (0, 0)) for option_text in q_options_list]
+        chart_sizes = [peso for _, peso in option_tallies]
+        option_counts = [count for count, _ in option_tallies]
+        if not any(chart_sizes):
+            if self.results_display_frame.winfo_exists(): ttk.Label(
                 self.results_display_frame, text=f"Sin votos válidos:\n'{q_text}'").pack(pady=20)
             return
-        fig, ax = plt.subplots(figsize=(6, 4.5));
-        wedges, _, autotexts = ax.pie(chart_sizes, labels=None, autopct=lambda p: '{:.1f}%'.format(p) if p > 0 else '',
-                                      startangle=90, pctdistance=0.85, wedgeprops=dict(width=0.4));
-        ax.axis('equal');
-        ax.legend(wedges, chart_labels, title="Opciones", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1),
-                  fontsize='small');
-        plt.subplots_adjust(left=0.05, right=0.65, top=0.9, bottom=0.05)
-        title_text = f"Resultados: {q_text}"
-        if final:
-            title_text = f"Resultados Finales: {q_text}"
-        elif q_estado == ESTADO_PREGUNTA_ACTIVA:
-            title_text = f"Resultados Parciales: {q_text} (Votación Abierta)"
-        elif q_estado == ESTADO_PREGUNTA_CERRADA:
-            title_text = f"Resultados (Votación Cerrada): {q_text}"
-        plt.title(title_text, pad=20, loc='center', fontsize=10)
         info_text_lines = [f"Pregunta ID: {question_id_for_results}"];
         info_text_lines.append("\nConteo (votantes):");
-        for opt_text, count in raw_counts_display.items(): info_text_lines.append(f"- {opt_text}: {count}")
+        for opt_text, count in dict(zip(q_options_list, option_counts)).items(): info_text_lines.append(
+            f"- {opt_text}: {count}")
         info_text_lines.append(f"\nTotal peso emitido: {total_weighted_votes_cast}");
-        total_possible_weight_in_assembly = sum(voting_weights_for_assembly.values());
         info_text_lines.append(f"Total peso posible: {total_possible_weight_in_assembly}")
         if total_possible_weight_in_assembly > 0: participation = (
                                                                               total_weighted_votes_cast / total_possible_weight_in_assembly) * 100; info_text_lines.append(
             f"Participación: {participation:.1f}%")
-        if hasattr(self.results_display_frame, 'winfo_exists') and self.results_display_frame.winfo_exists():
+        # Resultado parcial unánime (todo el peso en una opción): basta una etiqueta, sin armar el gráfico
+        voted_options = [i for i, peso in enumerate(chart_sizes) if peso]
+        if not final and len(voted_options) == 1:
+            if self.results_display_frame.winfo_exists():
+                ttk.Label(self.results_display_frame,
+                          text=f"Unánime: {q_options_list[voted_options[0]]} ({chart_sizes[voted_options[0]]} p)",
+                          font=("Arial", 12, "bold")).pack(pady=(20, 5))
+                ttk.Label(self.results_display_frame, text="\n".join(info_text_lines), justify=tk.LEFT,
+                          wraplength=380).pack(pady=5, anchor='w', padx=5)
+            return
+        percentages = [(peso / total_weighted_votes_cast) * 100 if total_weighted_votes_cast > 0 else 0
+                       for peso in chart_sizes]
+        chart_labels = [f"{option_text}\n({peso} p, {percentage:.1f}%)"
+                        for option_text, peso, percentage in zip(q_options_list, chart_sizes, percentages)]
+        fig, ax = self._ensure_results_chart();
+        wedges, _, autotexts = ax.pie(chart_sizes, labels=None, autopct=lambda p: '{:.1f}%'.format(p) if p > 0 else '',
+                                      startangle=90, pctdistance=0.85, wedgeprops=dict(width=0.4));
+        ax.axis('equal');
+        ax.legend(wedges, chart_labels, title="Opciones", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1),
+                  fontsize='small');
+        title_text = (TITULO_RESULTADOS_FINALES if final else
+                      TITULOS_RESULTADOS.get(q_estado, TITULO_RESULTADOS)).format(q_text)
+        ax.set_title(title_text, pad=20, loc='center', fontsize=10)
+        if self.results_display_frame.winfo_exists():
             ttk.Label(self.results_display_frame, text="\n".join(info_text_lines), justify=tk.LEFT,
                       wraplength=380).pack(pady=5, anchor='w', padx=5)
             try:
@@ -952,16 +1544,22 @@ class App:
                 else:
                     image_filename = f"asamblea_{self.current_assembly_id}_preg_{question_id_for_results}_{safe_q_text}_{filename_suffix}_{timestamp}.png"
                 filepath = os.path.join(GRAFICOS_DIR, image_filename);
-                fig.savefig(filepath, bbox_inches='tight');
-                print(f"Gráfico guardado: {filepath}")
+                self._report_chart_saved(self._chart_saver.submit(save_figure_snapshot, pickle.dumps(fig), filepath))
             except Exception as e:
                 print(f"Error guardando gráfico: {e}"); messagebox.showwarning("Error Guardar Gráfico",
                                                                                f"No se pudo guardar:\n{e}")
-            figure_canvas = FigureCanvasTkAgg(fig, master=self.results_display_frame);
-            self.results_canvas_widget = figure_canvas.get_tk_widget();
             self.results_canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True);
-            figure_canvas.draw()
-        plt.close(fig)
+            self.results_canvas.draw_idle()
+
+    def _report_chart_saved(self, future):
+        # Informa desde el hilo de Tk el resultado del guardado hecho en segundo plano
+        if not future.done():
+            self.root.after(INTERVALO_SONDEO_LECTOR_MS, self._report_chart_saved, future); return
+        try:
+            print(f"Gráfico guardado: {future.result()}")
+        except Exception as e:
+            print(f"Error guardando gráfico: {e}"); messagebox.showwarning("Error Guardar Gráfico",
+                                                                           f"No se pudo guardar:\n{e}")
 
 
 # --- Main ---